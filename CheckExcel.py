@@ -1,12 +1,11 @@
-from openpyxl import load_workbook
+from V2_WorkbookCache import load_sheet
 
-# Load the Excel file
-workbook = load_workbook(rf"C:\Users\uziki\OneDrive\שולחן העבודה\2שבצק.xlsx")
-sheet = workbook['Sheet3']
+# Load the Excel file (parsed once, then served from the workbook cache)
+sheet = load_sheet(rf"C:\Users\uziki\OneDrive\שולחן העבודה\2שבצק.xlsx", 'Sheet3')
 
 # Iterate over each row
 i =0
-for row in sheet.iter_rows(values_only=True):
+for row in sheet.iter_rows():
     # Get the names from columns A, B, C, D
     names = set(row[0:4])
 
@@ -28,7 +27,7 @@ for row in sheet.iter_rows(values_only=True):
     previous_indices = {}
 
 # Iterate over each row
-for i, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
+for i, row in enumerate(sheet.iter_rows(min_row=2), start=2):
     # Get the names from columns A, B, C, D
     names = set(row[0:4])
 
@@ -1,8 +1,11 @@
 from openpyxl import load_workbook
 
-# Load the Excel file
-workbook = load_workbook(rf"C:\Users\uziki\OneDrive\שולחן העבודה\2שבצק.xlsx")
-sheet = workbook['Sheet4']
+from V2_WorkbookCache import load_sheet
+
+path = rf"C:\Users\uziki\OneDrive\שולחן העבודה\2שבצק.xlsx"
+
+# Load the Excel file (parsed once, then served from the workbook cache)
+sheet = load_sheet(path, 'Sheet4')
 
 # List of names
 names = [ "ויקטור", "מני", "גבי", "אריה", "יונתן", "מימון", "אפשטיין", "יעקב",
@@ -20,33 +23,33 @@ day = -1
 for row in range(1, sheet.max_row + 1):
     # create new day
     check_row = False
-    if sheet.cell(row=row, column=1).value == "משמרת 1":
+    if sheet.cell(row, 1) == "משמרת 1":
         for i in range(len(names)):
             result[i].append([0, 0, 0, 0])
         day += 1
         check_row = True
         shift = 0
-    elif sheet.cell(row=row, column=1).value == "משמרת 2":
+    elif sheet.cell(row, 1) == "משמרת 2":
         check_row = True
         shift = 1
-    elif sheet.cell(row=row, column=1).value == "משמרת 3":
+    elif sheet.cell(row, 1) == "משמרת 3":
         check_row = True
         shift = 2
-    elif sheet.cell(row=row, column=1).value == "משמרת 4":
+    elif sheet.cell(row, 1) == "משמרת 4":
         check_row = True
         shift = 3
 
     if check_row:
         # Iterate through each cell in the row
         for col in range(2, 15):  # Assuming negative  names are in columns B and M
-            cell_value = sheet.cell(row=row, column=col).value
+            cell_value = sheet.cell(row, col)
             if cell_value:
                 for name in names:
                     if name in cell_value:
                         result[names.index(name)][day][shift] = -1
 
         for col in range(15, 21):  # Assuming positive  names are in columns B and M
-            cell_value = sheet.cell(row=row, column=col).value
+            cell_value = sheet.cell(row, col)
             if cell_value:
                 for name in names:
                     if name in cell_value:
@@ -63,19 +66,26 @@ for name in names:
     print(f"], #{name}")
 print("]")
 
-for row in sheet.iter_rows(min_row=2, max_row=sheet.max_row, min_col=1, max_col=13):
+updates = []
+for row_num, row in enumerate(sheet.iter_rows(min_row=2, max_row=sheet.max_row, min_col=1, max_col=13), start=2):
     # Check if column A contains the string "משמרת"
-    if  row[0].value and "משמרת" in row[0].value:
+    if  row[0] and "משמרת" in row[0]:
         # Join values from columns B-G with "+"
-        joined_values_1 = '+'.join(str(cell.value) for cell in row[1:7] if cell.value)
+        joined_values_1 = '+'.join(str(value) for value in row[1:7] if value)
 
         # Join values from columns H-M with "+"
-        joined_values_2 = '+'.join(str(cell.value) for cell in row[7:13] if cell.value)
+        joined_values_2 = '+'.join(str(value) for value in row[7:13] if value)
 
         print(joined_values_1)
-        # Save the joined values in columns T and U respectively
-        sheet.cell(row=row[0].row, column=21).value = joined_values_1  # Column T
-        sheet.cell(row=row[0].row, column=22).value = joined_values_2  # Column U
+        if (sheet.cell(row_num, 21) or "", sheet.cell(row_num, 22) or "") != (joined_values_1, joined_values_2):
+            updates.append((row_num, joined_values_1, joined_values_2))
 
-# Save the workbook
-workbook.save(r"C:\Users\uziki\OneDrive\שולחן העבודה\2שבצק.xlsx")
\ No newline at end of file
+# Save the joined values in columns T and U respectively; the workbook is only
+# opened for writing when they changed, so unchanged files keep hitting the cache
+if updates:
+    workbook = load_workbook(path)
+    out_sheet = workbook['Sheet4']
+    for row_num, joined_values_1, joined_values_2 in updates:
+        out_sheet.cell(row=row_num, column=21).value = joined_values_1  # Column T
+        out_sheet.cell(row=row_num, column=22).value = joined_values_2  # Column U
+    workbook.save(path)
@@ -1,15 +1,15 @@
-import openpyxl
 from openpyxl.styles.colors import Color
 
 from collections import defaultdict
 import matplotlib.pyplot as plt
 import numpy as np
 
+from V2_WorkbookCache import load_sheet
+
 ignore_names = ["אלדד", "אורי", "אליסף", "כוח דדה", "אזרחים", "מאיר\בועז", "הדריאל", "אורי רוזנצוויג", "עמוס"]
 
-# Open the Excel file and select Sheet3
-wb = openpyxl.load_workbook(rf"C:\Users\uziki\OneDrive\שולחן העבודה\2שבצק.xlsx", data_only=True)
-sheet = wb['Sheet1']
+# Open the Excel file and select Sheet1 (parsed once, then served from the workbook cache)
+sheet = load_sheet(rf"C:\Users\uziki\OneDrive\שולחן העבודה\2שבצק.xlsx", 'Sheet1', data_only=True, fills=True)
 
 
 lines_with_yom = []
@@ -17,13 +17,14 @@ first_line = "יום ראשון 25.02"
 pass_first_line = False
 pass_first_black = False
 # Iterate over cells in column A
-for cell in sheet['A']:
-    if cell.fill.start_color.index == Color('FF000000').index:
+for row in range(1, sheet.max_row + 1):
+    value = sheet.cell(row, 1)
+    if sheet.fill(row, 1) == Color('FF000000').index:
         pass_first_black = True
-    if cell.value and first_line in str(cell.value):
+    if value and first_line in str(value):
         pass_first_line = True
-    if cell.value and "יום" in str(cell.value) and (pass_first_line or not pass_first_black):
-        lines_with_yom.append(cell.row)
+    if value and "יום" in str(value) and (pass_first_line or not pass_first_black):
+        lines_with_yom.append(row)
 
 # Initialize a dictionary to store name counts for each time slot
 time_slot_counts = {'2:00-8:00': defaultdict(int), '8:00-14:00': defaultdict(int),
@@ -38,7 +39,7 @@ for row_number in lines_with_yom:
     # Iterate over columns B, C, D, E for rows from row_number + 2 to row_number + 5
     for row in range(row_number + 2, row_number + 6):  # 2 to 5 inclusive
         for column in range(2, 7):  # B to F
-            name = sheet.cell(row=row, column=column).value
+            name = sheet.cell(row, column)
             if name and ":" not in name and name not in ignore_names:
                 if "עמוס" in name:
                     a=4
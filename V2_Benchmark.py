@@ -0,0 +1,534 @@
+# Benchmarks for plan_shifts model variants
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+import ortools
+from ortools.sat.python import cp_model
+
+from V2_NurseProblem import (plan_shifts, build_shift_model, solve_shift_model, schedule_objective,
+                             equivalent_people, request_masks, person_limits, requirement_for,
+                             shift_intervals_overlap_any, build_rest_conflict_index, build_rest_conflict_cliques,
+                             InfeasibleRosterError, REST_FORMULATIONS)
+from V2_RollingHorizon import plan_shifts_rolling
+from V2_InstanceGenerator import generate_instance, example_week
+
+# generator arguments of the standard suite; keep names stable so reports diff cleanly
+DEFAULT_SUITE = {
+    "small_week": dict(num_people=20, num_days=7, num_extra_shifts=4, seed=1),
+    "team_fortnight": dict(num_people=40, num_days=14, num_extra_shifts=6, seed=2),
+    "tight_fortnight": dict(num_people=40, num_days=14, num_extra_shifts=6, tightness=0.95, seed=3),
+    "dense_unavailability": dict(num_people=40, num_days=14, num_extra_shifts=6, unavailable_density=0.5,
+                                 load_per_day=0.5, seed=4),
+    "month_80x30": dict(num_people=80, num_days=30, num_extra_shifts=6, seed=5),
+}
+
+
+def repeat_weeks(instance: Dict, weeks: int) -> Dict:
+    """Tile a one-week instance into a `weeks`-long horizon (quotas scaled accordingly)."""
+    out = dict(instance)
+    out["shift_requests"] = [row * weeks for row in instance["shift_requests"]]
+    out["shift_requirements"] = {s: list(v) * weeks for s, v in instance["shift_requirements"].items()}
+    out["num_days"] = instance["num_days"] * weeks
+    out["min_shifts_per_person"] = instance["min_shifts_per_person"] * weeks
+    out["max_shifts_per_person"] = instance["max_shifts_per_person"] * weeks
+    return out
+
+
+def resize_instance(instance: Dict, num_people: int, num_days: int) -> Dict:
+    """Cycle the people and days of `instance` to num_people x num_days (requirements scaled by headcount)."""
+    P = len(instance["names"])
+    D = instance["num_days"]
+    scale = num_people / P
+    out = dict(instance)
+    out["names"] = [f"{instance['names'][i % P]} {i // P}" for i in range(num_people)]
+    out["shift_requests"] = [[instance["shift_requests"][i % P][d % D] for d in range(num_days)]
+                             for i in range(num_people)]
+    out["shift_requirements"] = {s: [int(round(v[d % D] * scale)) for d in range(num_days)]
+                                 for s, v in instance["shift_requirements"].items()}
+    out["num_days"] = num_days
+    out["min_shifts_per_person"] = instance["min_shifts_per_person"] * num_days // D
+    out["max_shifts_per_person"] = instance["max_shifts_per_person"] * num_days // D
+    return out
+
+
+def solve_or_reject(solve: Callable[[], Dict]):
+    """
+    (result, status, reasons) of a plan_shifts-style call. A roster rejected
+    with InfeasibleRosterError gives (None, "INFEASIBLE", reasons) instead of
+    aborting the benchmark; no schedule gives (None, None, None).
+    """
+    try:
+        out = solve()
+    except InfeasibleRosterError as e:
+        return None, "INFEASIBLE", e.reasons
+    return out, out["status"] if out else None, None
+
+
+def build_baseline_model(
+    names: List[str],
+    shift_requests: List[List[List[int]]],
+    STANDARD_SHIFTS: List[str],
+    shift_time_map: Dict,
+    target_shifts: Dict[str, int],
+    num_days: int = None,
+    shift_requirements=1,
+    min_shifts_per_person=0,
+    max_shifts_per_person=999,
+    min_rest_hours: float = 8.0,
+    avoid_double_shift_pairs_daywise: List = None,
+    double_shift_penalty_weight: int = 50,
+    soft_single_shift_weight: int = 20,
+    rest_formulation: str = "pairwise",
+) -> dict:
+    """
+    plan_shifts' model as it was built before build_shift_model: a dict of
+    variables, nested Python sum() expressions and two constraints per
+    min/max. Same constraints and objective; baseline for benchmark_build only.
+    """
+    build_start = time.perf_counter()
+    P = len(names)
+    if num_days is None:
+        num_days = len(shift_requests[0])
+    min_shifts = person_limits(min_shifts_per_person, P)
+    max_shifts = person_limits(max_shifts_per_person, P)
+
+    model = cp_model.CpModel()
+    shift_names = list(shift_time_map.keys())
+
+    # 2) cells marked -1
+    std_intervals_map = {std: shift_time_map[std] for std in STANDARD_SHIFTS}
+    forbidden = set()
+    for p in range(P):
+        for d in range(num_days):
+            for std_idx, std_name in enumerate(STANDARD_SHIFTS):
+                if shift_requests[p][d][std_idx] == -1:
+                    for s in shift_names:
+                        if shift_intervals_overlap_any(shift_time_map[s], std_intervals_map[std_name]):
+                            forbidden.add((p, d, s))
+
+    assign = {}
+    for p in range(P):
+        for d in range(num_days):
+            for s in shift_names:
+                if (p, d, s) not in forbidden:
+                    assign[(p, d, s)] = model.NewBoolVar(f"assign_p{p}_d{d}_s_{s}")
+
+    person_vars = [[] for _ in range(P)]
+    day_vars = {}
+    cell_vars = {}
+    for (p, d, s), var in assign.items():
+        person_vars[p].append(var)
+        day_vars.setdefault((p, d), []).append(var)
+        cell_vars.setdefault((d, s), []).append(var)
+
+    # 1) coverage
+    for d in range(num_days):
+        for s in shift_names:
+            model.Add(sum(cell_vars.get((d, s), [])) == requirement_for(shift_requirements, s, d))
+
+    # 3) min/max shifts per person
+    for p in range(P):
+        model.Add(sum(person_vars[p]) >= min_shifts[p])
+        model.Add(sum(person_vars[p]) <= max_shifts[p])
+
+    # 4) min rest
+    if rest_formulation == "pairwise":
+        rest_index = build_rest_conflict_index(shift_time_map, num_days, min_rest_hours)
+        for p in range(P):
+            for (d1, s1, d2, s2) in rest_index["pairs"]:
+                a, b = assign.get((p, d1, s1)), assign.get((p, d2, s2))
+                if a is not None and b is not None:
+                    model.Add(a + b <= 1)
+    elif rest_formulation == "clique":
+        rest_cliques = build_rest_conflict_cliques(shift_time_map, num_days, min_rest_hours)
+        for p in range(P):
+            for clique in rest_cliques:
+                live = [assign[(p, d, s)] for (d, s) in clique if (p, d, s) in assign]
+                if len(live) > 1:
+                    model.AddAtMostOne(live)
+    else:
+        rest_minutes = int(round(min_rest_hours * 60))
+        hulls = {s: (int(round(min(a for a, _ in iv) * 60)), int(round(max(b for _, b in iv) * 60)))
+                 for s, iv in shift_time_map.items()}
+        for p in range(P):
+            intervals = []
+            for d in range(num_days):
+                for s in shift_names:
+                    if (p, d, s) not in assign:
+                        continue
+                    start, end = hulls[s]
+                    intervals.append(model.NewOptionalFixedSizeIntervalVar(
+                        d * 1440 + start, end - start + rest_minutes, assign[(p, d, s)], f"rest_p{p}_d{d}_s_{s}"))
+            model.AddNoOverlap(intervals)
+
+    # 5) preferences
+    preference_terms = []
+    for p in range(P):
+        for d in range(num_days):
+            for std_idx, std_name in enumerate(STANDARD_SHIFTS):
+                if shift_requests[p][d][std_idx] == 1:
+                    for s in shift_names:
+                        if (p, d, s) in assign and shift_intervals_overlap_any(shift_time_map[s],
+                                                                                shift_time_map[std_name]):
+                            preference_terms.append(assign[(p, d, s)])
+
+    # 6) targets
+    for p, person_name in enumerate(names):
+        if person_name in target_shifts:
+            model.Add(sum(person_vars[p]) == target_shifts[person_name])
+
+    # 7) avoided pairs
+    double_shift_penalties = []
+    for (day_a, shift_a, day_b, shift_b) in avoid_double_shift_pairs_daywise or []:
+        for p in range(P):
+            if (p, day_a, shift_a) not in assign or (p, day_b, shift_b) not in assign:
+                continue
+            a, b = assign[(p, day_a, shift_a)], assign[(p, day_b, shift_b)]
+            both = model.NewBoolVar(f"both_p{p}_d{day_a}_{shift_a}_d{day_b}_{shift_b}")
+            model.AddBoolAnd([a, b]).OnlyEnforceIf(both)
+            model.AddBoolOr([a.Not(), b.Not()]).OnlyEnforceIf(both.Not())
+            double_shift_penalties.append(both)
+
+    # 8) (shifts that day - 1) per person-day
+    multi_shift_penalties = [sum(day_vars.get((p, d), [])) - 1 for p in range(P) for d in range(num_days)]
+
+    max_shifts_var = model.NewIntVar(0, num_days * len(shift_names), "max_shifts")
+    for p in range(P):
+        model.Add(sum(person_vars[p]) <= max_shifts_var)
+
+    model.Maximize(
+        1000 * sum(preference_terms)
+        - max_shifts_var
+        - double_shift_penalty_weight * sum(double_shift_penalties)
+        - soft_single_shift_weight * sum(multi_shift_penalties)
+    )
+    return {"model": model, "assign": assign, "build_seconds": time.perf_counter() - build_start}
+
+
+def benchmark_build(instance: Dict, builder: Callable = build_shift_model) -> Dict:
+    """
+    Wall time and peak memory of building (not solving) the model.
+
+    The build is timed untraced, then repeated under tracemalloc for the peak of
+    Python-side allocations (the model proto itself lives in C++).
+    """
+    start = time.perf_counter()
+    built = builder(**instance)
+    seconds = time.perf_counter() - start
+    proto = built["model"].Proto()
+    stats = {
+        "build_seconds": seconds,
+        "num_variables": len(proto.variables),
+        "num_constraints": len(proto.constraints),
+    }
+    del built, proto
+
+    tracemalloc.start()
+    builder(**instance)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats["peak_mb"] = peak / 2 ** 20
+    return stats
+
+
+def benchmark_rest_formulations(instance: Dict, formulations=REST_FORMULATIONS,
+                                time_limit_seconds: int = 60) -> List[Dict]:
+    """Solve `instance` once per rest formulation and collect model size and timings."""
+    rows = []
+    for formulation in formulations:
+        out, status, reasons = solve_or_reject(lambda: plan_shifts(
+            **instance, rest_formulation=formulation, time_limit_seconds=time_limit_seconds))
+        row = {"formulation": formulation, "status": status, "objective": None, "reasons": reasons}
+        if out:
+            row.update(out["model_stats"])
+            row["objective"] = out["objective"]
+        rows.append(row)
+    return rows
+
+
+def benchmark_rolling(instance: Dict, window_days: int = 14, overlap_days: int = 7,
+                      monolithic_time_limit: int = 120, window_time_limit: int = 20) -> List[Dict]:
+    """Wall time and whole-horizon objective of the monolithic solve vs the rolling-horizon driver."""
+    rows = []
+    for label, solve in (
+        ("monolithic", lambda: plan_shifts(**instance, time_limit_seconds=monolithic_time_limit)),
+        (f"rolling {window_days}/{overlap_days}", lambda: plan_shifts_rolling(
+            **instance, time_limit_seconds=window_time_limit,
+            window_days=window_days, overlap_days=overlap_days)),
+    ):
+        start = time.perf_counter()
+        out, status, reasons = solve_or_reject(solve)
+        rows.append({
+            "method": label,
+            "wall_seconds": time.perf_counter() - start,
+            "status": status,
+            "objective": out["objective"] if out else None,
+            "reasons": reasons,
+        })
+    return rows
+
+
+def benchmark_symmetry_breaking(instance: Dict, time_limit_seconds: int = 120) -> List[Dict]:
+    """Time-to-optimal of plan_shifts with and without symmetry breaking between interchangeable people."""
+    P = len(instance["names"])
+    classes = equivalent_people(instance["names"], instance["shift_requests"], instance["target_shifts"],
+                                person_limits(instance.get("min_shifts_per_person", 0), P),
+                                person_limits(instance.get("max_shifts_per_person", 999), P))
+    rows = []
+    for symmetry_breaking in (False, True):
+        start = time.perf_counter()
+        out, status, reasons = solve_or_reject(lambda: plan_shifts(
+            **instance, time_limit_seconds=time_limit_seconds, symmetry_breaking=symmetry_breaking))
+        rows.append({
+            "symmetry_breaking": symmetry_breaking,
+            "classes": len(classes),
+            "people_in_classes": sum(len(members) for members in classes),
+            "status": status,
+            "reasons": reasons,
+            "objective": out["objective"] if out else None,
+            "first_solution_seconds": out["model_stats"]["first_solution_seconds"] if out else None,
+            "wall_seconds": time.perf_counter() - start,
+        })
+    return rows
+
+
+def build_reified_excess_model(soft_single_shift_weight: int = 20, **instance) -> dict:
+    """
+    The "tight" objective (excess shifts per person-day) encoded the textbook way:
+    a BoolVar per person-day reified to sum >= 2 and an excess variable fixed by
+    two reified equalities, on top of the "linear" model. Baseline for
+    benchmark_penalty_formulations only.
+    """
+    built = build_shift_model(**instance, soft_single_shift_weight=soft_single_shift_weight,
+                              penalty_formulation="linear")
+    model = built["model"]
+    LinearExpr = cp_model.LinearExpr
+    excess_vars = []
+    for p, person in enumerate(built["grid"]):
+        for d, row in enumerate(person):
+            today = [v for v in row if v is not None]
+            if len(today) < 2:
+                continue
+            total = LinearExpr.Sum(today)
+            multi = model.NewBoolVar(f"multi_p{p}_d{d}")
+            excess = model.NewIntVar(0, len(today) - 1, f"excess_p{p}_d{d}")
+            model.Add(total >= 2).OnlyEnforceIf(multi)
+            model.Add(total <= 1).OnlyEnforceIf(multi.Not())
+            model.Add(excess == total - 1).OnlyEnforceIf(multi)
+            model.Add(excess == 0).OnlyEnforceIf(multi.Not())
+            excess_vars.append(excess)
+    # swap the linear rule-8 term for the excess
+    live = LinearExpr.Sum(list(built["assign"].values()))
+    multi_shift_offset = len(built["names"]) * built["num_days"]
+    built["objective"] = (built["objective"] + soft_single_shift_weight * (live - multi_shift_offset)
+                          - soft_single_shift_weight * LinearExpr.Sum(excess_vars))
+    model.Maximize(built["objective"])
+    return built
+
+
+def benchmark_penalty_formulations(instance: Dict, time_limit_seconds: int = 120) -> List[Dict]:
+    """
+    Time to optimal and schedule quality of the soft-penalty encodings: "linear",
+    the reified-excess baseline and "tight". Every schedule is scored the same
+    way: its "tight" objective, preference points, excess shifts over one per
+    person-day, avoided-pair violators and the largest load.
+    """
+    pairs = instance.get("avoid_double_shift_pairs_daywise")
+    builders = {
+        "linear": lambda: build_shift_model(**instance, penalty_formulation="linear"),
+        "reified": lambda: build_reified_excess_model(**instance),
+        "tight": lambda: build_shift_model(**instance, penalty_formulation="tight"),
+    }
+    rows = []
+    for label, build in builders.items():
+        start = time.perf_counter()
+        out = solve_shift_model(build(), time_limit_seconds)
+        row = {"formulation": label, "wall_seconds": time.perf_counter() - start,
+               "status": out["status"] if out else None}
+        if out:
+            data = out["schedule"].data
+            _, preferred = request_masks(instance["shift_requests"], instance["STANDARD_SHIFTS"],
+                                         instance["shift_time_map"], instance["num_days"])
+            row.update({
+                "tight_objective": schedule_objective(
+                    out["schedule"], instance["names"], instance["shift_requests"], instance["STANDARD_SHIFTS"],
+                    instance["shift_time_map"], instance["num_days"], pairs, penalty_formulation="tight"),
+                "preference_points": int((data * preferred).sum()),
+                "excess_shifts": int(np.maximum(data.sum(axis=2, dtype=np.int64) - 1, 0).sum()),
+                "double_shift_violators": sum(len(e["violators"]) for e in out["double_shift_status"]),
+                "max_load": int(data.sum(axis=(1, 2)).max(initial=0)),
+                "solve_seconds": out["model_stats"]["solve_seconds"],
+            })
+        rows.append(row)
+    return rows
+
+
+def benchmark_objective_modes(instance: Dict, time_limit_seconds: int = 120, **plan_kwargs) -> List[Dict]:
+    """Weighted vs staged objective: wall time, status and weighted objective, plus the per-stage report."""
+    rows = []
+    for mode in ("weighted", "staged"):
+        start = time.perf_counter()
+        out, status, reasons = solve_or_reject(lambda: plan_shifts(
+            **instance, time_limit_seconds=time_limit_seconds, objective_mode=mode, **plan_kwargs))
+        rows.append({
+            "mode": mode,
+            "wall_seconds": time.perf_counter() - start,
+            "status": status,
+            "reasons": reasons,
+            "objective": out["objective"] if out else None,
+            "stages": out.get("stages", []) if out else [],
+        })
+    return rows
+
+
+def run_benchmark_suite(suite: Dict[str, Dict] = None, time_limit_seconds: int = 60,
+                        report_path: str = None, **plan_kwargs) -> Dict:
+    """
+    Generate each instance of `suite` ({case name: generate_instance kwargs}), solve it
+    with plan_shifts and collect build/solve/first-solution time, objective and model
+    size, plus the improvement curve. A roster the precheck rejects is recorded as
+    "INFEASIBLE" with its reasons. The report is written as JSON to report_path
+    when given.
+    """
+    suite = DEFAULT_SUITE if suite is None else suite
+    cases = {}
+    for case, generator_kwargs in suite.items():
+        instance = generate_instance(**generator_kwargs)
+        start = time.perf_counter()
+        out, status, reasons = solve_or_reject(lambda: plan_shifts(
+            **instance, time_limit_seconds=time_limit_seconds, **plan_kwargs))
+        row = {
+            "generator": generator_kwargs,
+            "status": status or "NO_SOLUTION",
+            "wall_seconds": time.perf_counter() - start,
+        }
+        if reasons:
+            row["reasons"] = reasons
+        if out:
+            row["objective"] = out["objective"]
+            row.update(out["model_stats"])
+            row["improvement_curve"] = out["improvement_curve"]
+        cases[case] = row
+        print(f"  {case:<22}{row['status']:<12}{row.get('objective', '')!s:>12}{row['wall_seconds']:>9.2f}s")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "ortools": ortools.__version__,
+            "time_limit_seconds": time_limit_seconds,
+            "plan_kwargs": plan_kwargs,
+        },
+        "cases": cases,
+    }
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+    return report
+
+
+def compare_reports(old_path: str, new_path: str):
+    """Print per-case changes between two run_benchmark_suite reports."""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)["cases"]
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)["cases"]
+    fields = ("status", "objective", "num_variables", "num_constraints",
+              "build_seconds", "first_solution_seconds", "solve_seconds", "wall_seconds")
+    for case in sorted(set(old) | set(new)):
+        a, b = old.get(case, {}), new.get(case, {})
+        print(case)
+        for field in fields:
+            va, vb = a.get(field), b.get(field)
+            if isinstance(va, float) and isinstance(vb, float):
+                print(f"  {field:<24}{va:>12.3f} -> {vb:>12.3f}")
+            else:
+                print(f"  {field:<24}{va!s:>12} -> {vb!s:>12}")
+
+
+def print_rows(title: str, rows: List[Dict]):
+    print(f"\n{title}")
+    print(f"  {'formulation':<12}{'status':<10}{'objective':>11}{'vars':>8}{'constraints':>13}"
+          f"{'build[s]':>10}{'solve[s]':>10}")
+    for r in rows:
+        if r["objective"] is None:
+            print(f"  {r['formulation']:<12}{r['status'] or 'no solution'}")
+            continue
+        print(f"  {r['formulation']:<12}{r['status']:<10}{r['objective']:>11.0f}{r['num_variables']:>8}"
+              f"{r['num_constraints']:>13}{r['build_seconds']:>10.2f}{r['solve_seconds']:>10.2f}")
+
+
+# --------------------------
+# Example roster (same as V2_NurseProblem.py)
+# --------------------------
+if __name__ == "__main__":
+
+    # python V2_Benchmark.py suite [report.json]    - run DEFAULT_SUITE and save the report
+    # python V2_Benchmark.py compare old.json new.json
+    if len(sys.argv) > 1 and sys.argv[1] == "suite":
+        run_benchmark_suite(report_path=sys.argv[2] if len(sys.argv) > 2 else "benchmark_report.json")
+        sys.exit(0)
+    if len(sys.argv) > 1 and sys.argv[1] == "compare":
+        compare_reports(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+
+    week = example_week()
+
+    print_rows("Rest formulations, 1 week", benchmark_rest_formulations(week))
+    print_rows("Rest formulations, 4 weeks", benchmark_rest_formulations(repeat_weeks(week, 4)))
+
+    for weeks in (8, 12):
+        print(f"\nMonolithic vs rolling horizon, {weeks} weeks")
+        for r in benchmark_rolling(repeat_weeks(week, weeks)):
+            print(f"  {r['method']:<14}{str(r['status']):<10}{r['objective']!s:>11}{r['wall_seconds']:>9.1f}s")
+
+    interchangeable = {
+        "3 copies of the week, 2 weeks": resize_instance(week, 39, 14),
+        "4 copies of the week, 4 weeks": resize_instance(week, 52, 28),
+        "30 identical people, 2 weeks": generate_instance(30, 14, unavailable_density=0, day_off_density=0,
+                                                           preference_density=0, seed=7),
+    }
+    for label, instance in interchangeable.items():
+        print(f"\nSymmetry breaking, {label}")
+        for r in benchmark_symmetry_breaking(instance):
+            print(f"  {'on' if r['symmetry_breaking'] else 'off':<5}{r['classes']:>3} classes "
+                  f"({r['people_in_classes']} people)  {str(r['status']):<10}{r['objective']!s:>11}"
+                  f"{r['wall_seconds']:>9.1f}s")
+
+    penalty_cases = {
+        "4 weeks": repeat_weeks(week, 4),
+        "2 copies of the week, 2 weeks": resize_instance(week, 26, 14),
+        "generated 30 x 14, 8h rest": dict(generate_instance(30, 14, min_rest_hours=8, seed=2),
+                                           avoid_double_shift_pairs_daywise=[(1, "15:00-21:00", 2, "09:00-15:00")]),
+    }
+    for label, instance in penalty_cases.items():
+        print(f"\nSoft-penalty formulations, {label}")
+        print(f"  {'formulation':<12}{'status':<10}{'wall[s]':>8}{'tight obj':>11}{'prefs':>7}{'excess':>8}"
+              f"{'pairs':>7}{'max load':>10}")
+        for r in benchmark_penalty_formulations(instance):
+            if r["status"] is None:
+                print(f"  {r['formulation']:<12}no solution")
+                continue
+            print(f"  {r['formulation']:<12}{r['status']:<10}{r['wall_seconds']:>8.1f}{r['tight_objective']:>11.0f}"
+                  f"{r['preference_points']:>7}{r['excess_shifts']:>8}{r['double_shift_violators']:>7}"
+                  f"{r['max_load']:>10}")
+
+    for label, instance in (("4 weeks", repeat_weeks(week, 4)),
+                            ("generated 80 x 30", generate_instance(**DEFAULT_SUITE["month_80x30"]))):
+        print(f"\nWeighted vs staged objective, {label}")
+        for r in benchmark_objective_modes(instance, penalty_formulation="tight"):
+            print(f"  {r['mode']:<10}{str(r['status']):<10}{r['objective']!s:>11}{r['wall_seconds']:>9.1f}s")
+            for stage in r["stages"]:
+                print(f"    {stage['stage']:<12}{stage['status']:<12}{stage['value']!s:>7} "
+                      f"(bound {stage['bound']}){stage['seconds']:>8.1f}s")
+
+    big = resize_instance(week, 500, 60)
+    print("\nModel build, 500 people x 60 days")
+    for label, builder in (("baseline", build_baseline_model), ("bulk", build_shift_model)):
+        stats = benchmark_build(big, builder)
+        print(f"  {label:<10}{stats['build_seconds']:>7.1f}s, peak Python memory {stats['peak_mb']:.0f} MB, "
+              f"{stats['num_variables']} vars, {stats['num_constraints']} constraints")
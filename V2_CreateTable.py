@@ -1,55 +1,83 @@
-import openpyxl
-from py._builtin import enumerate
+import numpy as np
+from openpyxl.utils import get_column_letter
+
+from V2_WorkbookCache import load_sheet
 
 days = 7
 shifts = 4
-wb = openpyxl.load_workbook(rf"העדפות שמירה.xlsx", data_only=True)
-sheet = wb['Sheet1']
-
-names_list = []
-min_row = 1
-first_name_line_num = -1
-
-# Iterate over the rows in column A
-for row in sheet.iter_rows(min_row=min_row, max_row=sheet.max_row, min_col=1, max_col=1, values_only=True):
-    name = row[0]  # Assuming the name is in the first column (column A)
-    min_row += 1
-    if name:  # Check if the cell is not empty
+PREFERENCES_FILE = "העדפות שמירה.xlsx"
+
+
+def parse_preference(value):
+    """
+    Value of one preference cell: -1 (contains "לא"), 0 (empty) or 1.
+
+    Returns (preference, ok); ok is False for non-empty cells that are neither
+    "לא" nor "כן" - they still count as 1, as they always did.
+    """
+    if value is None:
+        return 0, True
+    text = str(value)
+    if "לא" in text:
+        return -1, True
+    return 1, "כן" in text
+
+
+def load_preferences(path: str = PREFERENCES_FILE, sheet_name: str = "Sheet1",
+                     days: int = days, shifts: int = shifts) -> dict:
+    """
+    Stream the preferences sheet into solver-ready arrays.
+
+    Every row with a name in column A is a person; the next days * shifts
+    columns hold their preferences, day by day. The sheet is read once in
+    openpyxl's read-only mode and cached by content (V2_WorkbookCache). Returns:
+      "names"          - list of names, in sheet order
+      "shift_requests" - int8 array [person][day][shift] of -1 / 0 / 1, which
+                         plan_shifts accepts as shift_requests
+      "malformed"      - (cell, name, day, shift, value) of cells that are not
+                         empty, "לא" or "כן"
+    """
+    grid = load_sheet(path, sheet_name, min_col=1, max_col=days * shifts + 1, data_only=True)
+    names_list = []
+    rows = []
+    malformed = []
+    for row_num, row in enumerate(grid.values, start=grid.min_row):
+        name = row[0]
+        if not name:
+            continue
+        person = np.zeros((days, shifts), dtype=np.int8)
+        for day in range(days):
+            for shift in range(shifts):
+                col = day * shifts + shift + 1
+                value = row[col]
+                person[day, shift], ok = parse_preference(value)
+                if not ok:
+                    malformed.append((f"{get_column_letter(col + 1)}{row_num}", name, day, shift, value))
         names_list.append(name)
-        if first_name_line_num == -1:
-            first_name_line_num = min_row - 1
-
-results = []
-row_ind = 0
-for row in sheet.iter_rows(min_row=first_name_line_num, max_row=first_name_line_num+len(names_list)-1, min_col=2, max_col=days*shifts+1, values_only=True):
-    weekly_shifts = list()
-    for day in range(days):
-        day_shifts = list()
-        for shift in range(shifts):
-            # if row[day*shifts + shift] == "כן":
-            #     day_shifts.append(1)
-            if row[day*shifts + shift] is not None and "לא" in row[day*shifts + shift]:
-                day_shifts.append(-1)
-            elif row[day*shifts + shift] is None:
-                day_shifts.append(0)
-            else:
-                day_shifts.append(1)
-                # raise ValueError(rf"Error!!!!! wrong value. row_ind={row_ind}, day={day} val='{row[day*shifts + shift]}'")
-
-        weekly_shifts.append(day_shifts)
-    results.append(weekly_shifts)
-    row_ind += 1
-
-print("names = ", end="")
-print(names_list)
-
-print("shift_requests = [")
-for name_ind, name in enumerate(names_list):
-    print("[", end="")
-    for i, day_shifts in enumerate(results[name_ind]):
-        e = ", "
-        if i==len(results[name_ind])-1:
-            e = ""
-        print(day_shifts, end=e)
-    print(f"], #{name}")
-print("]")
\ No newline at end of file
+        rows.append(person)
+
+    shift_requests = np.stack(rows) if rows else np.zeros((0, days, shifts), dtype=np.int8)
+    return {"names": names_list, "shift_requests": shift_requests, "malformed": malformed}
+
+
+if __name__ == "__main__":
+    loaded = load_preferences()
+    names_list = loaded["names"]
+    results = loaded["shift_requests"].tolist()
+
+    for cell, name, day, shift, value in loaded["malformed"]:
+        print(f"# malformed cell {cell} ({name}, day {day}, shift {shift}): {value!r}")
+
+    print("names = ", end="")
+    print(names_list)
+
+    print("shift_requests = [")
+    for name_ind, name in enumerate(names_list):
+        print("[", end="")
+        for i, day_shifts in enumerate(results[name_ind]):
+            e = ", "
+            if i==len(results[name_ind])-1:
+                e = ""
+            print(day_shifts, end=e)
+        print(f"], #{name}")
+    print("]")
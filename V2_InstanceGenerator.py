@@ -0,0 +1,184 @@
+# Seeded synthetic instances for plan_shifts
+import math
+import random
+from typing import Dict
+
+STANDARD_SHIFTS = ["03:00-09:00", "09:00-15:00", "15:00-21:00", "21:00-03:00"]
+
+STANDARD_TIME_MAP = {
+    "03:00-09:00": [(3, 9)],
+    "09:00-15:00": [(9, 15)],
+    "15:00-21:00": [(15, 21)],
+    "21:00-03:00": [(21, 27)],
+}
+
+# the custom shifts used by the real rosters, tried first
+KNOWN_EXTRA_SHIFTS = {
+    "יזומה 149 בוקר": [(6, 9), (17, 18.5)],
+    "יזומה 149 בוקר ק": [(6, 9)],
+    "יזומה 149 ערב": [(18.5, 23)],
+    "דרום 18-24": [(18, 24)],
+    "הורדיון 09-13": [(9, 13)],
+    "הורדיון 13-17": [(13, 17)],
+}
+
+
+def _hh(h: float) -> str:
+    h = h % 24
+    return f"{int(h):02d}{':30' if h % 1 else ''}"
+
+
+def generate_shift_catalog(num_extra_shifts: int, split_shift_ratio: float, rnd: random.Random) -> Dict:
+    """The 4 standard shifts plus num_extra_shifts custom ones (split shifts with probability split_shift_ratio)."""
+    catalog = dict(STANDARD_TIME_MAP)
+    for name, intervals in list(KNOWN_EXTRA_SHIFTS.items())[:num_extra_shifts]:
+        catalog[name] = intervals
+    i = 0
+    while len(catalog) < len(STANDARD_SHIFTS) + num_extra_shifts:
+        i += 1
+        length = rnd.choice([3, 4, 4.5, 6])
+        if rnd.random() < split_shift_ratio:
+            start = rnd.randrange(10, 28) / 2
+            gap = rnd.choice([4, 6, 8])
+            second = rnd.choice([1.5, 2, 3])
+            intervals = [(start, start + length), (start + length + gap, start + length + gap + second)]
+            name = f"משימה {i} {_hh(start)}-{_hh(start + length)} + {_hh(start + length + gap)}"
+        else:
+            start = rnd.randrange(0, 48) / 2
+            intervals = [(start, start + length)]
+            name = f"משימה {i} {_hh(start)}-{_hh(start + length)}"
+        catalog[name] = intervals
+    return catalog
+
+
+def generate_instance(
+    num_people: int = 20,
+    num_days: int = 7,
+    num_extra_shifts: int = 4,
+    split_shift_ratio: float = 0.25,
+    unavailable_density: float = 0.3,
+    day_off_density: float = 0.1,
+    preference_density: float = 0.1,
+    load_per_day: float = 5 / 7,
+    tightness: float = 0.8,
+    min_rest_hours: float = 12,
+    seed: int = 0,
+) -> Dict:
+    """
+    Random roster in plan_shifts' keyword-argument form.
+
+    unavailable_density / preference_density - share of standard-shift cells
+        marked -1 / 1; day_off_density - share of person-days marked -1 whole
+    load_per_day - average shifts per person per day; total required seats
+        are num_people * num_days * load_per_day, spread over (day, shift)
+    tightness - average load / max_shifts_per_person (1.0 leaves no slack);
+        min_shifts_per_person mirrors the same band below the average
+    The same arguments always give the same instance.
+    """
+    rnd = random.Random(seed)
+    shift_time_map = generate_shift_catalog(num_extra_shifts, split_shift_ratio, rnd)
+    shift_names = list(shift_time_map)
+
+    names = [f"עובד {p + 1}" for p in range(num_people)]
+    shift_requests = []
+    for _ in range(num_people):
+        row = []
+        for _ in range(num_days):
+            if rnd.random() < day_off_density:
+                row.append([-1] * len(STANDARD_SHIFTS))
+                continue
+            cells = []
+            for _ in STANDARD_SHIFTS:
+                r = rnd.random()
+                cells.append(-1 if r < unavailable_density else 1 if r < unavailable_density + preference_density else 0)
+            row.append(cells)
+        shift_requests.append(row)
+
+    # standard shifts carry most of the demand, custom shifts the rest
+    weights = [3 if s in STANDARD_TIME_MAP else 1 for s in shift_names]
+    shift_requirements = {s: [0] * num_days for s in shift_names}
+    seats = int(round(num_people * num_days * load_per_day))
+    for _ in range(seats):
+        d = rnd.randrange(num_days)
+        s = rnd.choices(shift_names, weights)[0]
+        shift_requirements[s][d] += 1
+
+    avg_load = num_days * load_per_day
+    max_shifts = max(1, math.ceil(avg_load / tightness))
+    min_shifts = max(0, math.floor(avg_load - (max_shifts - avg_load)))
+
+    return dict(
+        names=names,
+        shift_requests=shift_requests,
+        STANDARD_SHIFTS=list(STANDARD_SHIFTS),
+        shift_time_map=shift_time_map,
+        target_shifts={},
+        num_days=num_days,
+        shift_requirements=shift_requirements,
+        min_shifts_per_person=min_shifts,
+        max_shifts_per_person=max_shifts,
+        min_rest_hours=min_rest_hours,
+    )
+
+
+def example_week() -> Dict:
+    """The real one-week roster the scripts run as their example, in plan_shifts' keyword-argument form."""
+    names = ['אברהם דיאמנד', 'אהרון רוטנברג', 'אוהד אלקיים', 'אור חבזה', 'אסף ברזיס', 'דביר רוזנברג', 'דין קרמזין',
+             'יאיר בן יוסף', 'יובל ברוכיאן', 'יפתח בן זמרה', 'עודד טובולסקי', 'רונן איזיק', 'רזיאל זקבך']
+    shift_requests = [
+        [[0, 0, -1, -1], [0, 0, -1, 0], [0, -1, 0, 0], [0, 0, 0, 0], [0, 0, -1, -1], [0, 0, -1, -1], [0, 0, 0, 0]],
+        # אברהם דיאמנד
+        [[-1, -1, -1, -1], [0, 0, -1, 0], [0, -1, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]],
+        # אהרון רוטנברג
+        [[-1, 0, 1, 0], [-1, -1, -1, -1], [-1, -1, -1, 0], [0, 0, 1, 0], [0, 0, 1, 0], [0, 0, 1, 0], [0, 1, 0, 0]],
+        # אוהד אלקיים
+        [[-1, -1, -1, -1], [0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 1]],
+        # אור חבזה
+        [[1, 0, 0, 0], [1, -1, -1, -1], [-1, -1, -1, -1], [1, 0, 0, 0], [1, 0, 0, 0], [1, 0, 0, 0], [1, 0, 0, 0]],
+        # אסף ברזיס
+        [[0, 1, 0, 0], [0, 1, -1, 0], [-1, -1, -1, -1], [0, 1, 0, 0], [0, 1, -1, 0], [0, 1, 0, 0], [0, 0, 0, 0]],
+        # דביר רוזנברג
+        [[0, 0, 1, 0], [1, -1, -1, -1], [-1, -1, -1, -1], [0, 0, 1, 0], [0, 0, 1, 0], [0, 0, 1, 0], [0, 0, 0, 0]],
+        # דין קרמזין
+        [[0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]],
+        # יאיר בן יוסף
+        [[-1, 0, 1, 0], [1, 0, 0, 0], [1, 0, 0, 0], [-1, -1, 0, 0], [-1, -1, 0, 0], [-1, -1, 1, 0], [0, 0, 0, 0]],
+        # יובל ברוכיאן
+        [[0, -1, 0, 1], [0, -1, -1, -1], [1, 0, 0, -1], [0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 0]],
+        # יפתח בן זמרה
+        [[0, 0, -1, -1], [0, 0, 0, 0], [1, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [-1, -1, -1, -1], [-1, 0, 0, -1]],
+        # עודד טובולסקי
+        [[-1, 0, -1, 0], [1, -1, 0, 0], [0, -1, 0, 0], [0, -1, 0, -1], [-1, -1, 1, 0], [-1, -1, -1, -1], [0, 0, 0, 0]],
+        # רונן איזיק
+        [[1, 0, 0, 0], [1, 0, 0, 0], [0, 0, 0, 1], [0, 0, 0, 1], [1, 0, 0, 0], [1, 0, 0, 0], [-1, -1, -1, -1]],
+        # רזיאל זקבך
+    ]
+
+    shift_time_map = dict(STANDARD_TIME_MAP)
+    for name in ["יזומה 149 בוקר", "יזומה 149 בוקר ק", "יזומה 149 ערב", "דרום 18-24"]:
+        shift_time_map[name] = KNOWN_EXTRA_SHIFTS[name]
+
+    shift_requirements = {
+        "03:00-09:00":          [1, 2, 2, 2, 2, 2, 1],
+        "09:00-15:00":          [1, 2, 3, 0, 0, 0, 0],
+        "15:00-21:00":          [1, 2, 2, 0, 1, 0, 1],
+        "21:00-03:00":          [2, 3, 2, 2, 1, 1, 2],
+        "יזומה 149 בוקר ק":      [0, 2, 0, 0, 0, 0, 0],
+        "יזומה 149 בוקר":        [3, 0, 0, 2, 3, 3, 3],
+        "יזומה 149 ערב":         [3, 0, 0, 3, 3, 3, 2],
+        "דרום 18-24":            [0, 0, 0, 0, 0, 1, 1],
+    }
+
+    return dict(
+        names=names,
+        shift_requests=shift_requests,
+        STANDARD_SHIFTS=list(STANDARD_SHIFTS),
+        shift_time_map=shift_time_map,
+        target_shifts={},
+        num_days=7,
+        shift_requirements=shift_requirements,
+        min_shifts_per_person=5,
+        max_shifts_per_person=6,
+        min_rest_hours=12,
+        avoid_double_shift_pairs_daywise=[(1, "15:00-21:00", 2, "09:00-15:00")],
+    )
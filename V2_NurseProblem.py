@@ -1,8 +1,16 @@
 # shift_planner_cp_sat.py
+import heapq
+import time
+from collections.abc import Mapping
+from functools import lru_cache
+import numpy as np
+from ortools.graph.python import max_flow
 from ortools.sat.python import cp_model
-from typing import Dict, List, Tuple, Union
+from typing import Callable, Dict, List, Tuple, Union
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment
+from openpyxl.utils import get_column_letter
 
 # --------------------------
 # Helper functions
@@ -33,10 +41,547 @@ def shifts_violate_rest(day_a: int, intervals_a: List[Tuple[float, float]],
                 return True
     return False
 
+def sweep_rest(shifts: List[Tuple[int, str]], shift_time_map: Dict[str, List[Tuple[float, float]]],
+               min_rest_hours: float):
+    """
+    Rest breaches among one person's (day, shift) assignments.
+
+    All intervals are flattened onto one timeline (day * 24 + hour, so shifts
+    that cross midnight and split shifts need no special casing), sorted once
+    and swept; only intervals that ended less than min_rest_hours before the
+    current start are kept active. Intervals of the same (day, shift) are
+    never compared and each pair of assignments is reported once, with its
+    tightest interval pair.
+
+    Returns (breaches, tightest): breaches is a list of
+    (rest, (day_a, shift_a, interval_a), (day_b, shift_b, interval_b)) in
+    timeline order, interval_a being the one that starts first (rest < 0 means
+    the intervals overlap); tightest is the smallest rest between any two
+    assignments in the same form, or None if there are fewer than two.
+    """
+    timeline = sorted(
+        (d * 24.0 + a, d * 24.0 + b, d, s, (a, b))
+        for d, s in set(shifts) for (a, b) in shift_time_map[s]
+    )
+    active = []              # heap of (end, position) of intervals that can still clash
+    latest = []              # the two latest ends of distinct assignments so far: [(end, position)]
+    breaches = {}
+    tightest = None
+    for j, (start, end, d, s, interval) in enumerate(timeline):
+        while active and active[0][0] <= start - min_rest_hours:
+            heapq.heappop(active)
+        for _, i in active:
+            _, _, d0, s0, interval0 = timeline[i]
+            if (d0, s0) == (d, s):
+                continue
+            rest = hours_between_intervals(d0, interval0, d, interval)
+            key = frozenset(((d0, s0), (d, s)))
+            if key not in breaches or rest < breaches[key][0]:
+                breaches[key] = (rest, (d0, s0, interval0), (d, s, interval))
+        for _, i in latest:
+            _, _, d0, s0, interval0 = timeline[i]
+            if (d0, s0) != (d, s):
+                rest = hours_between_intervals(d0, interval0, d, interval)
+                if tightest is None or rest < tightest[0]:
+                    tightest = (rest, (d0, s0, interval0), (d, s, interval))
+                break
+        heapq.heappush(active, (end, j))
+        ends = {timeline[i][2:4]: (e, i) for e, i in latest}
+        if (d, s) not in ends or end > ends[(d, s)][0]:
+            ends[(d, s)] = (end, j)
+        latest = sorted(ends.values(), reverse=True)[:2]
+    return list(breaches.values()), tightest
+
+def requirement_for(shift_requirements, shift_name: str, day: int) -> int:
+    """Required people for (day, shift) under plan_shifts' shift_requirements forms."""
+    if isinstance(shift_requirements, int):
+        return shift_requirements
+    if isinstance(shift_requirements, dict):
+        v = shift_requirements.get(shift_name, None)
+        if v is None:
+            return 1
+        if isinstance(v, int):
+            return v
+        return v[day]
+    return 1
+
+def requirement_grid(shift_requirements, shift_names: List[str], num_days: int) -> np.ndarray:
+    """D x S int array of requirement_for over every (day, shift)."""
+    return np.array([[requirement_for(shift_requirements, s, d) for s in shift_names] for d in range(num_days)],
+                    dtype=np.int64).reshape(num_days, len(shift_names))
+
+def person_limits(value: Union[int, List[int]], num_people: int) -> List[int]:
+    """min/max_shifts_per_person (one int for everyone, or one per person) as a per-person list."""
+    return [value] * num_people if isinstance(value, int) else list(value)
+
 # --------------------------
-# Core function
+# Shift catalog (minute grid)
 # --------------------------
-def plan_shifts(
+MINUTES_PER_DAY = 24 * 60
+
+
+def to_minutes(hours: float) -> int:
+    return int(round(hours * 60))
+
+
+class ShiftCatalog:
+    """
+    A shift_time_map compiled onto a whole-minute grid.
+
+    Per shift (in shift_time_map order) it keeps intervals[k], an int array
+    of (start, end) minutes from the start of its day (ends past 1440 cross
+    midnight), the hull starts[k] .. ends[k], and bits[k], a bitset (Python
+    int) with bit m set for every worked minute m, so a same-day overlap test
+    is an AND. The rest rule of shifts_violate_rest only depends on the hulls:
+    (d_b - d_a) * 1440 + starts[b] - ends[a] < min rest (see violates_rest).
+    """
+
+    def __init__(self, shift_time_map: Dict[str, List[Tuple[float, float]]]):
+        self.shift_names = list(shift_time_map)
+        self.shift_to_idx = {s: k for k, s in enumerate(self.shift_names)}
+        self.intervals = []
+        self.bits = []
+        for s in self.shift_names:
+            minutes = np.array([(to_minutes(a), to_minutes(b)) for a, b in shift_time_map[s]],
+                               dtype=np.int64).reshape(-1, 2)
+            if len(minutes) == 0:
+                raise ValueError(f"Shift '{s}' has no intervals")
+            if (minutes[:, 0] < 0).any():
+                raise ValueError(f"Shift '{s}' starts before 00:00 of its day")
+            mask = 0
+            for a, b in minutes.tolist():
+                if b > a:
+                    mask |= ((1 << (b - a)) - 1) << a
+            minutes.setflags(write=False)
+            self.intervals.append(minutes)
+            self.bits.append(mask)
+        self.starts = np.array([m[:, 0].min() for m in self.intervals], dtype=np.int64)
+        self.ends = np.array([m[:, 1].max() for m in self.intervals], dtype=np.int64)
+        # gaps[a, b]: minutes from the end of shift a to the start of shift b on the same day
+        self.gaps = self.starts[None, :] - self.ends[:, None]
+        for array in (self.starts, self.ends, self.gaps):
+            array.setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self.shift_names)
+
+    def overlap_matrix(self, rows: List[str] = None, cols: List[str] = None) -> np.ndarray:
+        """Bool array [len(rows)][len(cols)] of same-day overlaps (default: all shifts)."""
+        rows = self.shift_names if rows is None else rows
+        cols = self.shift_names if cols is None else cols
+        col_bits = [self.bits[self.shift_to_idx[c]] for c in cols]
+        return np.array([[bool(self.bits[self.shift_to_idx[r]] & b) for b in col_bits] for r in rows],
+                        dtype=bool).reshape(len(rows), len(cols))
+
+    def violates_rest(self, day_a: int, shift_a: str, day_b: int, shift_b: str, min_rest_hours: float) -> bool:
+        """O(1) shifts_violate_rest for two shifts of the catalog, on the minute grid."""
+        gap = self.gaps[self.shift_to_idx[shift_a], self.shift_to_idx[shift_b]]
+        return (day_b - day_a) * MINUTES_PER_DAY + int(gap) < to_minutes(min_rest_hours)
+
+
+@lru_cache(maxsize=32)
+def _compile_shift_catalog(catalog_key: tuple) -> ShiftCatalog:
+    return ShiftCatalog(dict(catalog_key))
+
+
+def compile_shift_catalog(shift_time_map: Dict[str, List[Tuple[float, float]]]) -> ShiftCatalog:
+    """The (cached, read-only) ShiftCatalog of a float-hour shift_time_map."""
+    if isinstance(shift_time_map, ShiftCatalog):
+        return shift_time_map
+    return _compile_shift_catalog(_shift_catalog_key(shift_time_map))
+
+
+def request_masks(shift_requests, STANDARD_SHIFTS: List[str],
+                  shift_time_map: Dict[str, List[Tuple[float, float]]],
+                  num_days: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    shift_requests ([person][day][standard shift] of -1 / 0 / 1) projected onto
+    every shift of the catalog through its S x 4 overlap matrix. Rows may be
+    longer than num_days; only the first num_days days are used.
+
+    Returns (forbidden, preferred), both P x D x S: forbidden is True where the
+    shift overlaps a standard shift marked -1; preferred counts the standard
+    shifts marked 1 that it overlaps (each is worth one preference point).
+    """
+    overlaps = compile_shift_catalog(shift_time_map).overlap_matrix(cols=STANDARD_SHIFTS).astype(np.int64)
+    requests = np.asarray(shift_requests, dtype=np.int8)
+    requests = requests.reshape(len(requests), -1, len(STANDARD_SHIFTS))[:, :num_days]
+    forbidden = (requests == -1).astype(np.int64) @ overlaps.T > 0
+    preferred = (requests == 1).astype(np.int64) @ overlaps.T
+    return forbidden, preferred
+
+# --------------------------
+# Schedule tensor
+# --------------------------
+class Schedule(Mapping):
+    """
+    A schedule stored as a P x D x S uint8 array (person, day, shift).
+
+    It reads like the legacy {(name, day, shift): 1} dict - keys are the
+    assigned cells, lookups are O(1) - so it can be passed anywhere a solution
+    dict is accepted. data[p, d, k] is 1 when names[p] works shift_names[k]
+    on day d.
+    """
+
+    def __init__(self, names: List[str], shift_names: List[str], num_days: int, data: np.ndarray = None):
+        self.names = list(names)
+        self.shift_names = list(shift_names)
+        self.num_days = num_days
+        self.name_to_idx = {n: i for i, n in enumerate(self.names)}
+        self.shift_to_idx = {s: k for k, s in enumerate(self.shift_names)}
+        shape = (len(self.names), num_days, len(self.shift_names))
+        if data is None:
+            data = np.zeros(shape, dtype=np.uint8)
+        elif data.shape != shape:
+            raise ValueError(f"Schedule data has shape {data.shape}, expected {shape}")
+        self.data = data
+
+    @classmethod
+    def from_dict(cls, solution: Dict[Tuple[str, int, str], int], names: List[str],
+                  shift_names: List[str], num_days: int) -> "Schedule":
+        schedule = cls(names, shift_names, num_days)
+        for (name, d, s), v in solution.items():
+            if v:
+                schedule[(name, d, s)] = 1
+        return schedule
+
+    def to_dict(self) -> Dict[Tuple[str, int, str], int]:
+        return {key: 1 for key in self}
+
+    def _index(self, key: Tuple[str, int, str]) -> Tuple[int, int, int]:
+        name, d, s = key
+        if name not in self.name_to_idx:
+            raise ValueError(f"Person {name} not in names list")
+        if s not in self.shift_to_idx:
+            raise ValueError(f"Shift {s} not in shift list")
+        if not 0 <= d < self.num_days:
+            raise ValueError(f"Day {d} out of range 0..{self.num_days - 1}")
+        return self.name_to_idx[name], d, self.shift_to_idx[s]
+
+    def __setitem__(self, key: Tuple[str, int, str], value: int):
+        self.data[self._index(key)] = 1 if value else 0
+
+    def __getitem__(self, key: Tuple[str, int, str]) -> int:
+        if key not in self:
+            raise KeyError(key)
+        return 1
+
+    def __contains__(self, key) -> bool:
+        try:
+            name, d, s = key
+            p, k = self.name_to_idx[name], self.shift_to_idx[s]
+        except (KeyError, TypeError, ValueError):
+            return False
+        return 0 <= d < self.num_days and bool(self.data[p, d, k])
+
+    def __iter__(self):
+        for p, d, k in np.argwhere(self.data):
+            yield self.names[p], int(d), self.shift_names[k]
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.data))
+
+    def __repr__(self) -> str:
+        return f"Schedule({len(self.names)} people x {self.num_days} days x {len(self.shift_names)} shifts, {len(self)} assigned)"
+
+    def person(self, name: str) -> np.ndarray:
+        """D x S view of one person's assignments."""
+        return self.data[self.name_to_idx[name]]
+
+    def day(self, d: int) -> np.ndarray:
+        """P x S view of one day's assignments."""
+        return self.data[:, d, :]
+
+    def people_on(self, d: int, shift_name: str) -> List[str]:
+        return [self.names[p] for p in np.flatnonzero(self.data[:, d, self.shift_to_idx[shift_name]])]
+
+    def person_shifts(self, name: str) -> List[Tuple[int, str]]:
+        """(day, shift) pairs of one person, by day and shift order."""
+        return [(int(d), self.shift_names[k]) for d, k in np.argwhere(self.person(name))]
+
+    def shift_counts(self) -> Dict[str, int]:
+        return dict(zip(self.names, self.data.sum(axis=(1, 2)).tolist()))
+
+
+def as_schedule(solution, names: List[str], shift_names: List[str], num_days: int) -> Schedule:
+    """`solution` as a Schedule over names x num_days x shift_names (no copy if it already is one)."""
+    if isinstance(solution, Schedule) and solution.names == list(names) \
+            and solution.shift_names == list(shift_names) and solution.num_days == num_days:
+        return solution
+    return Schedule.from_dict(solution, names, shift_names, num_days)
+
+
+def assignments_by_cell(solution) -> Dict[Tuple[int, str], List[str]]:
+    """{(day, shift): [names]} of a Schedule or solution dict, built in one pass."""
+    cells = {}
+    for (name, d, s), v in solution.items():
+        if v:
+            cells.setdefault((d, s), []).append(name)
+    return cells
+
+# --------------------------
+# Rest-conflict index
+# --------------------------
+def _shift_catalog_key(shift_time_map: Dict[str, List[Tuple[float, float]]]) -> tuple:
+    return tuple((s, tuple((float(a), float(b)) for a, b in intervals))
+                 for s, intervals in shift_time_map.items())
+
+@lru_cache(maxsize=32)
+def _build_rest_conflict_index(catalog_key: tuple, num_days: int, min_rest_hours: float) -> dict:
+    catalog = _compile_shift_catalog(catalog_key)
+    shift_names = catalog.shift_names
+    shift_idx = catalog.shift_to_idx
+    S = len(shift_names)
+
+    # day offsets on which s2 conflicts with an earlier s1, in plan_shifts' scan order:
+    # k runs from first (0, or 1 when s2 does not come after s1) while k * 1440 + gap < rest
+    first = 1 - np.triu(np.ones((S, S), dtype=np.int64), 1)
+    slack = to_minutes(min_rest_hours) - catalog.gaps
+    last = np.minimum(-((-slack) // MINUTES_PER_DAY) - 1, num_days - 1)
+    offsets = {}
+    for i, j in np.argwhere(last >= first):
+        offsets[(shift_names[i], shift_names[j])] = tuple(range(first[i, j], last[i, j] + 1))
+
+    # every (s1, s2, k) on every day d1 with d1 + k inside the horizon, sorted by (d1, s1, d2, s2)
+    triples = np.array([(shift_idx[s1], shift_idx[s2], k) for (s1, s2), ks in offsets.items() for k in ks],
+                       dtype=np.int64).reshape(-1, 3)
+    ii, jj, kk = triples.T
+    rows, days = np.nonzero(np.arange(num_days)[None, :] + kk[:, None] < num_days)
+    i1, i2, dd1 = ii[rows], jj[rows], days
+    dd2 = dd1 + kk[rows]
+    order = np.lexsort((i2, dd2, i1, dd1))
+    pairs = [(d_a, shift_names[a], d_b, shift_names[b]) for d_a, a, d_b, b in
+             zip(dd1[order].tolist(), i1[order].tolist(), dd2[order].tolist(), i2[order].tolist())]
+
+    return {
+        "offsets": offsets,
+        "max_offset": max((ks[-1] for ks in offsets.values()), default=0),
+        "pairs": tuple(pairs),
+    }
+
+def build_rest_conflict_index(shift_time_map: Dict[str, List[Tuple[float, float]]],
+                              num_days: int, min_rest_hours: float) -> dict:
+    """
+    Conflicting (day, shift) pairs for a shift catalog, horizon and rest rule.
+
+    The index does not depend on people, so it is built once and shared by all
+    persons (and cached between runs). "pairs" holds every (d1, s1, d2, s2) for
+    which shifts_violate_rest(d1, s1, d2, s2) holds, in the order plan_shifts
+    used to scan them.
+    """
+    return _build_rest_conflict_index(_shift_catalog_key(shift_time_map), num_days, float(min_rest_hours))
+
+@lru_cache(maxsize=32)
+def _build_rest_conflict_cliques(catalog_key: tuple, num_days: int, min_rest_hours: float) -> tuple:
+    index = _build_rest_conflict_index(catalog_key, num_days, min_rest_hours)
+    shift_idx = {s: i for i, (s, _) in enumerate(catalog_key)}
+    S = len(shift_idx)
+
+    def node(d, s):
+        return d * S + shift_idx[s]
+
+    adj = {}
+    for (d1, s1, d2, s2) in index["pairs"]:
+        a, b = node(d1, s1), node(d2, s2)
+        adj.setdefault(a, set()).add(b)
+        adj.setdefault(b, set()).add(a)
+
+    # greedy edge clique cover: every conflicting pair ends up in at least one clique
+    covered = set()
+    cliques = []
+    for u in sorted(adj):
+        for v in sorted(adj[u]):
+            if v < u or (u, v) in covered:
+                continue
+            clique = [u, v]
+            candidates = adj[u] & adj[v]
+            while candidates:
+                w = min(candidates)
+                clique.append(w)
+                candidates &= adj[w]
+            clique.sort()
+            for i, a in enumerate(clique):
+                for b in clique[i + 1:]:
+                    covered.add((a, b))
+            cliques.append(tuple((n // S, catalog_key[n % S][0]) for n in clique))
+    return tuple(cliques)
+
+def build_rest_conflict_cliques(shift_time_map: Dict[str, List[Tuple[float, float]]],
+                                num_days: int, min_rest_hours: float) -> tuple:
+    """
+    Cover of the rest-conflict pairs by cliques of (day, shift) cells.
+
+    At most one cell of each clique can be assigned to a person, and every pair
+    of build_rest_conflict_index()["pairs"] lies inside some clique, so one
+    AddAtMostOne per clique is equivalent to the pairwise encoding.
+    """
+    return _build_rest_conflict_cliques(_shift_catalog_key(shift_time_map), num_days, float(min_rest_hours))
+
+@lru_cache(maxsize=32)
+def _same_day_capacity(catalog_key: tuple, min_rest_hours: float, rest_formulation: str) -> Callable[[int], int]:
+    catalog = _compile_shift_catalog(catalog_key)
+    rest_minutes = to_minutes(min_rest_hours)
+    if rest_formulation == "no_overlap":
+        # padded hulls clash unless one of the two ends min rest before the other starts
+        clash = (catalog.gaps < rest_minutes) & (catalog.gaps.T < rest_minutes)
+    else:
+        # the shift listed first must end min rest before the later one starts
+        clash = np.triu(catalog.gaps < rest_minutes, 1)
+        clash |= clash.T
+    np.fill_diagonal(clash, False)
+    conflicts = [sum(1 << int(j) for j in np.flatnonzero(row)) for row in clash]
+
+    @lru_cache(maxsize=None)
+    def most_shifts(mask: int) -> int:
+        if not mask:
+            return 0
+        k = (mask & -mask).bit_length() - 1
+        rest = mask & ~(1 << k)
+        return max(most_shifts(rest), 1 + most_shifts(rest & ~conflicts[k]))
+
+    return most_shifts
+
+def same_day_capacity(shift_time_map: Dict[str, List[Tuple[float, float]]], min_rest_hours: float,
+                      rest_formulation: str = "pairwise") -> Callable[[int], int]:
+    """
+    most_shifts(mask): the most shifts of a bitmask (bit k = k-th shift of
+    shift_time_map) one person can work on one day under the rest rule as
+    rest_formulation encodes it - a max independent set of the same-day
+    conflicts. no_overlap allows two same-day shifts in either order, so it
+    has fewer conflicts than pairwise/clique.
+    """
+    return _same_day_capacity(_shift_catalog_key(shift_time_map), float(min_rest_hours), rest_formulation)
+
+REST_FORMULATIONS = ("pairwise", "clique", "no_overlap")
+COVERAGE_MODES = ("strict", "elastic")
+PENALTY_FORMULATIONS = ("linear", "tight")
+OBJECTIVE_MODES = ("weighted", "staged")
+
+
+def equivalent_people(names: List[str], shift_requests: List[List[List[int]]], target_shifts: Dict[str, int],
+                      min_shifts: List[int], max_shifts: List[int]) -> List[List[int]]:
+    """
+    Classes (of 2 or more person indices) that plan_shifts cannot tell apart:
+    the same shift_requests row, the same min/max and no target_shifts entry.
+    """
+    classes = {}
+    for p, name in enumerate(names):
+        if name in target_shifts:
+            continue
+        key = (np.asarray(shift_requests[p], dtype=np.int8).tobytes(), min_shifts[p], max_shifts[p])
+        classes.setdefault(key, []).append(p)
+    return [members for members in classes.values() if len(members) > 1]
+
+
+def add_lex_greater_equal(model: cp_model.CpModel, xs: list, ys: list, name: str):
+    """
+    Constrain the Bool vectors xs >= ys lexicographically (same length).
+
+    Returns the prefix literals: the i-th is true iff xs[:i + 1] == ys[:i + 1].
+    """
+    # prefix[i] <=> xs[:i] == ys[:i]; where the prefixes agree, xs[i] >= ys[i]
+    prefix = None
+    prefixes = []
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        ct = model.AddImplication(y, x)
+        if prefix is not None:
+            ct.OnlyEnforceIf(prefix)
+        if i == len(xs) - 1:
+            break
+        equal = model.NewBoolVar(f"{name}_eq{i}")
+        model.Add(x == y).OnlyEnforceIf(equal)
+        if prefix is None:
+            model.AddBoolOr([x, y, equal])
+            model.AddBoolOr([x.Not(), y.Not(), equal])
+        else:
+            model.AddImplication(equal, prefix)
+            model.AddBoolOr([prefix.Not(), x, y, equal])
+            model.AddBoolOr([prefix.Not(), x.Not(), y.Not(), equal])
+        prefix = equal
+        prefixes.append(equal)
+    return prefixes
+
+# --------------------------
+# Sequence rules
+# --------------------------
+SEQUENCE_OFF = "off"
+
+
+def compile_sequence_rules(sequence_rules: List[dict], shift_names: List[str]) -> List[dict]:
+    """
+    Check sequence rules and turn their steps into shift indices.
+
+    A rule is {"name": str, "pattern": [step, ...], "penalty": int or None}.
+    Each step is a shift name, a list of shift names (any of them) or "off"
+    (no shift that day); a person matches the rule from day d when days
+    d, d + 1, ... fit the steps in order. With penalty None the pattern is
+    forbidden, otherwise every match costs `penalty`. For example
+    {"name": "night then day", "pattern": ["21:00-03:00", "09:00-15:00"]}.
+    Returns copies with "steps": one tuple of shift indices per step (None
+    for "off").
+    """
+    shift_idx = {s: k for k, s in enumerate(shift_names)}
+    compiled = []
+    for i, rule in enumerate(sequence_rules):
+        pattern = rule.get("pattern")
+        if not pattern:
+            raise ValueError(f"Sequence rule {i} has an empty pattern")
+        steps = []
+        for step in pattern:
+            if step == SEQUENCE_OFF:
+                steps.append(None)
+                continue
+            step_shifts = [step] if isinstance(step, str) else list(step)
+            unknown = [s for s in step_shifts if s not in shift_idx]
+            if unknown or not step_shifts:
+                raise ValueError(f"Sequence rule {rule.get('name', i)!r}: unknown shifts {unknown} in step {step!r}")
+            steps.append(tuple(sorted(shift_idx[s] for s in step_shifts)))
+        penalty = rule.get("penalty")
+        if penalty is not None and penalty < 0:
+            raise ValueError(f"Sequence rule {rule.get('name', i)!r}: penalty must be >= 0")
+        compiled.append({
+            "name": rule.get("name", " -> ".join(map(str, pattern))),
+            "pattern": list(pattern),
+            "penalty": penalty,
+            "steps": tuple(steps),
+        })
+    return compiled
+
+
+def sequence_step_days(data: np.ndarray, step) -> np.ndarray:
+    """P x D bool: which person-days of a P x D x S schedule fit one compiled step."""
+    if step is None:
+        return ~data.any(axis=2)
+    return data[:, :, list(step)].any(axis=2)
+
+
+def sequence_matches(data: np.ndarray, rule: dict) -> np.ndarray:
+    """P x (D - len + 1) bool: the start days on which each person matches a compiled rule."""
+    P, D = data.shape[:2]
+    length = len(rule["steps"])
+    matches = np.ones((P, max(0, D - length + 1)), dtype=bool)
+    for i, step in enumerate(rule["steps"]):
+        matches &= sequence_step_days(data, step)[:, i:i + matches.shape[1]]
+    return matches
+
+
+def sequence_status(solution, names: List[str], shift_names: List[str], num_days: int,
+                    sequence_rules: List[dict] = None) -> List[dict]:
+    """Per rule, the (person, start day) matches of a schedule (dict or Schedule), like double_shift_status."""
+    schedule = as_schedule(solution, names, shift_names, num_days)
+    status = []
+    for rule in compile_sequence_rules(sequence_rules or [], shift_names):
+        status.append({
+            "rule": rule["name"],
+            "penalty": rule["penalty"],
+            "violators": [(names[p], int(d)) for p, d in np.argwhere(sequence_matches(schedule.data, rule))],
+        })
+    return status
+
+# --------------------------
+# Model builder
+# --------------------------
+def build_shift_model(
     names: List[str],
     shift_requests: List[List[List[int]]],     # shape: [persons][days][4 standard shifts]
     STANDARD_SHIFTS: List[str],                # ordered 4 standard shift names
@@ -47,213 +592,1300 @@ def plan_shifts(
     min_shifts_per_person: Union[int, List[int]] = 0,
     max_shifts_per_person: Union[int, List[int]] = 999,
     min_rest_hours: float = 8.0,
-    time_limit_seconds: int = 20,
     avoid_double_shift_pairs_daywise: List[Tuple[int, str, int, str]] = None,
     double_shift_penalty_weight: int = 50,
     soft_single_shift_weight: int = 20,
-
-
-):
+    rest_formulation: str = "pairwise",
+    diagnose: bool = False,
+    coverage_mode: str = "strict",
+    coverage_penalty_weight: int = 100000,
+    symmetry_breaking: bool = False,
+    penalty_formulation: str = "linear",
+    sequence_rules: List[dict] = None,
+) -> dict:
+    """
+    Build the CP-SAT model used by plan_shifts without solving it.
+
+    Variables are kept in array-backed blocks: grid[p][d][k] is the BoolVar of
+    person p on day d in shift_names[k] (None for forbidden cells), and every
+    constraint is emitted with LinearExpr.Sum / WeightedSum over those blocks.
+
+    rest_formulation selects how the min-rest rule (4) is encoded:
+      "pairwise"   - one two-literal AddAtMostOne per conflicting (day, shift) pair
+      "clique"     - one AddAtMostOne per clique of mutually conflicting cells
+      "no_overlap" - optional interval per cell, padded by min_rest_hours, in one
+                     AddNoOverlap per person. This is the symmetric rule that
+                     check_solution validates (applied to each shift's hull):
+                     unlike the other two it allows two same-day shifts when
+                     the one listed later in shift_time_map ends at least
+                     min_rest_hours before the other starts.
+
+    coverage_mode selects how the coverage rule (1) is encoded:
+      "strict"  - every (day, shift) gets exactly its required people
+      "elastic" - short/over slack variables per (day, shift), each missing or
+                  extra person costing coverage_penalty_weight (far above a
+                  preference's 1000), so a schedule exists whenever the
+                  per-person rules can be met; built["coverage_slack"] maps
+                  (day, shift) to its (short, over) variables
+
+    penalty_formulation selects the soft penalties 7 (avoided pairs) and 8
+    (several shifts on one day):
+      "linear" - a "both" BoolVar per person and avoided pair, linked to the
+                 two cells in both directions; rule 8 charges (shifts that
+                 day - 1) on every person-day, days off included, which adds
+                 up to a constant whenever coverage is exact
+      "tight"  - a "both" BoolVar implied by the two cells (one clause); rule 8
+                 charges only the excess: sum(day) <= 1 + excess, with excess
+                 bounded by the most shifts the rest rule lets fit on that day
+                 minus one (no variable where only one fits). The objective
+                 keeps both at their true value
+    The two give different objective values for the same schedule; see
+    schedule_objective.
+
+    sequence_rules (see compile_sequence_rules) are compiled per person and
+    start day: a step literal per person-day and step (a cell itself, or an
+    auxiliary BoolVar implied by the day's matching cells), then one clause
+    forbidding the match or implying a penalized BoolVar. The model grows
+    linearly with the horizon.
+
+    With symmetry_breaking=True the schedules of interchangeable people (see
+    equivalent_people) are ordered lexicographically, so the search skips
+    their permutations; built["symmetry_classes"] lists the classes and
+    built["lex_links"] the (prefix literals, p, q) of each ordered pair. Only
+    valid while nothing outside this builder singles out one of them.
+
+    With diagnose=True every hard constraint instance (coverage of a day/shift,
+    a person's min, max and target, a person's rest pair, a forbidden
+    sequence match) is enforced by its
+    own assumption literal, described in built["assumptions"], and rest is
+    always encoded pairwise; see diagnose_infeasibility.
+    """
+    if rest_formulation not in REST_FORMULATIONS:
+        raise ValueError(f"Unknown rest_formulation '{rest_formulation}', expected one of {REST_FORMULATIONS}")
+    if coverage_mode not in COVERAGE_MODES:
+        raise ValueError(f"Unknown coverage_mode '{coverage_mode}', expected one of {COVERAGE_MODES}")
+    if penalty_formulation not in PENALTY_FORMULATIONS:
+        raise ValueError(f"Unknown penalty_formulation '{penalty_formulation}', "
+                         f"expected one of {PENALTY_FORMULATIONS}")
+    if diagnose:
+        rest_formulation = "pairwise"
+
+    build_start = time.perf_counter()
     P = len(names)
     if num_days is None:
         num_days = len(shift_requests[0])
 
-    # normalize min/max per person
-    if isinstance(min_shifts_per_person, int):
-        min_shifts = [min_shifts_per_person] * P
-    else:
-        min_shifts = list(min_shifts_per_person)
-
-    if isinstance(max_shifts_per_person, int):
-        max_shifts = [max_shifts_per_person] * P
-    else:
-        max_shifts = list(max_shifts_per_person)
-
-    # requirement accessor
-    def req_for(shift_name: str, day: int) -> int:
-        if isinstance(shift_requirements, int):
-            return shift_requirements
-        if isinstance(shift_requirements, dict):
-            v = shift_requirements.get(shift_name, None)
-            if v is None:
-                return 1
-            if isinstance(v, int):
-                return v
-            else:
-                return v[day]
-        return 1
+    min_shifts = person_limits(min_shifts_per_person, P)
+    max_shifts = person_limits(max_shifts_per_person, P)
 
     model = cp_model.CpModel()
-
-    # decision vars
-    assign = {}
+    LinearExpr = cp_model.LinearExpr
     shift_names = list(shift_time_map.keys())
+    S = len(shift_names)
+    shift_idx = {s: k for k, s in enumerate(shift_names)}
+
+    # 2) cells marked -1 (every shift overlapping a forbidden standard shift) and,
+    # for 5), how many preferred standard shifts each cell overlaps
+    forbidden, preferred = request_masks(shift_requests, STANDARD_SHIFTS, shift_time_map, num_days)
 
+    # decision vars (forbidden cells are never created, so every family below
+    # only sees live variables); one person's cells at a time keeps the index
+    # lists small, and grid is the only view kept besides assign
+    assign = {}
+    grid = [[[None] * S for _ in range(num_days)] for _ in range(P)]
     for p in range(P):
-        for d in range(num_days):
-            for s in shift_names:
-                assign[(p, d, s)] = model.NewBoolVar(f"assign_p{p}_d{d}_s_{s}")
+        row = grid[p]
+        for d, k in zip(*np.nonzero(~forbidden[p])):
+            d, k = int(d), int(k)
+            s = shift_names[k]
+            var = model.NewBoolVar(f"assign_p{p}_d{d}_s_{s}")
+            assign[(p, d, s)] = var
+            row[d][k] = var
+
+    # diagnose mode: assumption literal index -> (family, readable description)
+    assumptions = {}
+
+    def assume(constraint, family: str, description: str):
+        literal = model.NewBoolVar(f"assume_{len(assumptions)}")
+        constraint.OnlyEnforceIf(literal)
+        model.AddAssumption(literal)
+        assumptions[literal.Index()] = (family, description)
 
     # 1) coverage constraints
+    required = requirement_grid(shift_requirements, shift_names, num_days)
+    coverage_slack = {}
     for d in range(num_days):
-        for s in shift_names:
-            req = req_for(s, d)
-            model.Add(sum(assign[(p, d, s)] for p in range(P)) == req)
-
-    # 2) forbid assignments marked -1
-    std_intervals_map = {std: shift_time_map[std] for std in STANDARD_SHIFTS}
-    for p in range(P):
-        for d in range(num_days):
-            for std_idx, std_name in enumerate(STANDARD_SHIFTS):
-                if shift_requests[p][d][std_idx] == -1:
-                    forbidden_intervals = std_intervals_map[std_name]
-                    for s in shift_names:
-                        assigned_intervals = shift_time_map[s]
-                        if shift_intervals_overlap_any(assigned_intervals, forbidden_intervals):
-                            model.Add(assign[(p, d, s)] == 0)
+        for k, s in enumerate(shift_names):
+            req = int(required[d, k])
+            cell_vars = [grid[p][d][k] for p in range(P) if grid[p][d][k] is not None]
+            if coverage_mode == "elastic":
+                if req == 0 and not cell_vars:
+                    continue
+                short = model.NewIntVar(0, req, f"short_d{d}_s_{s}")
+                over = model.NewIntVar(0, len(cell_vars), f"over_d{d}_s_{s}")
+                model.Add(LinearExpr.Sum(cell_vars) + short - over == req)
+                coverage_slack[(d, s)] = (short, over)
+                continue
+            ct = model.Add(LinearExpr.Sum(cell_vars) == req)
+            if diagnose:
+                assume(ct, "coverage", f"[Coverage] Day {d}, shift {s}: required={req}")
 
     # 3) min/max shifts per person
+    person_totals = [LinearExpr.Sum([v for row in grid[p] for v in row if v is not None]) for p in range(P)]
     for p in range(P):
-        total = [assign[(p, d, s)] for d in range(num_days) for s in shift_names]
-        model.Add(sum(total) >= min_shifts[p])
-        model.Add(sum(total) <= max_shifts[p])
+        if diagnose:
+            assume(model.Add(person_totals[p] >= min_shifts[p]), "min_shifts",
+                   f"[Min shifts] {names[p]}, min {min_shifts[p]}")
+            assume(model.Add(person_totals[p] <= max_shifts[p]), "max_shifts",
+                   f"[Max shifts] {names[p]}, max {max_shifts[p]}")
+        else:
+            model.AddLinearConstraint(person_totals[p], min_shifts[p], max_shifts[p])
 
     # 4) min rest constraints
-    for p in range(P):
-        person_shifts = [(d, s, shift_time_map[s]) for d in range(num_days) for s in shift_names]
-        N = len(person_shifts)
-        for i in range(N):
-            d1, s1, intervals1 = person_shifts[i]
-            for j in range(i+1, N):
-                d2, s2, intervals2 = person_shifts[j]
-                if d1 == d2 and s1 == s2:
-                    continue
-                '''if shifts_violate_rest(d1, intervals1, d2, intervals2, min_rest_hours) \
-                   or shifts_violate_rest(d2, intervals2, d1, intervals1, min_rest_hours):
-                    model.Add(assign[(p, d1, s1)] + assign[(p, d2, s2)] <= 1)'''
-                if shifts_violate_rest(d1, intervals1, d2, intervals2, min_rest_hours):
-                    model.Add(assign[(p, d1, s1)] + assign[(p, d2, s2)] <= 1)
-
-    # 5) preferences
+    if rest_formulation == "pairwise":
+        rest_index = build_rest_conflict_index(shift_time_map, num_days, min_rest_hours)
+        rest_pairs = [(d1, shift_idx[s1], d2, shift_idx[s2]) for (d1, s1, d2, s2) in rest_index["pairs"]]
+        for p in range(P):
+            g = grid[p]
+            for (d1, k1, d2, k2) in rest_pairs:
+                a, b = g[d1][k1], g[d2][k2]
+                if a is not None and b is not None:
+                    if diagnose:
+                        assume(model.AddBoolOr([a.Not(), b.Not()]), "rest",
+                               f"[Rest] {names[p]} between {shift_names[k1]}(day{d1}) "
+                               f"and {shift_names[k2]}(day{d2}), min {min_rest_hours}h")
+                    else:
+                        model.AddAtMostOne([a, b])
+    elif rest_formulation == "clique":
+        rest_cliques = [[(d, shift_idx[s]) for (d, s) in clique]
+                        for clique in build_rest_conflict_cliques(shift_time_map, num_days, min_rest_hours)]
+        for p in range(P):
+            g = grid[p]
+            for clique in rest_cliques:
+                live = [g[d][k] for (d, k) in clique if g[d][k] is not None]
+                if len(live) > 1:
+                    model.AddAtMostOne(live)
+    else:
+        # whole-minute grid; each shift occupies its hull plus the required rest after it
+        rest_minutes = to_minutes(min_rest_hours)
+        catalog = compile_shift_catalog(shift_time_map)
+        hulls = list(zip(catalog.starts.tolist(), catalog.ends.tolist()))
+        for p in range(P):
+            intervals = []
+            for d in range(num_days):
+                for k, var in enumerate(grid[p][d]):
+                    if var is None:
+                        continue
+                    start, end = hulls[k]
+                    intervals.append(model.NewOptionalFixedSizeIntervalVar(
+                        d * 1440 + start, end - start + rest_minutes, var,
+                        f"rest_p{p}_d{d}_s_{shift_names[k]}"))
+            model.AddNoOverlap(intervals)
+
+    # 4b) interchangeable people: each schedule >= the next one's (the live
+    # cells of identical rows are the same, so the vectors line up)
+    symmetry_classes = []
+    lex_links = []
+    if symmetry_breaking and not diagnose:
+        symmetry_classes = equivalent_people(names, shift_requests, target_shifts, min_shifts, max_shifts)
+        for members in symmetry_classes:
+            for p, q in zip(members, members[1:]):
+                prefixes = add_lex_greater_equal(model, [v for row in grid[p] for v in row if v is not None],
+                                                 [v for row in grid[q] for v in row if v is not None],
+                                                 f"lex_p{p}_p{q}")
+                lex_links.append((prefixes, p, q))
+
+    # 5) preferences: 1000 per preferred standard shift a live cell overlaps
     preference_terms = []
+    preference_coeffs = []
     for p in range(P):
-        for d in range(num_days):
-            for std_idx, std_name in enumerate(STANDARD_SHIFTS):
-                if shift_requests[p][d][std_idx] == 1:
-                    pref_intervals = shift_time_map[std_name]
-                    for s in shift_names:
-                        intervals = shift_time_map[s]
-                        if shift_intervals_overlap_any(intervals, pref_intervals):
-                            preference_terms.append(assign[(p, d, s)])
-
+        for d, k in zip(*np.nonzero(preferred[p] & ~forbidden[p])):
+            preference_terms.append(grid[p][d][k])
+            preference_coeffs.append(1000 * int(preferred[p, d, k]))
 
     # 6) force number of shifts per person
     for p, person_name in enumerate(names):
         if person_name in target_shifts:
-            total_shifts = sum(assign[(p, d, s)] for d in range(num_days) for s in shift_names)
-            model.Add(total_shifts == target_shifts[person_name])
+            ct = model.Add(person_totals[p] == target_shifts[person_name])
+            if diagnose:
+                assume(ct, "target", f"[Target] {person_name}, target {target_shifts[person_name]}")
 
     # 7) soft penalties: avoid same person assigned to both specified (day, shift) pairs
+    # (a pair with a forbidden side can never be doubled, so it gets no variable)
     double_shift_penalties = []
+    double_shift_links = []
     if avoid_double_shift_pairs_daywise:
         for (day_a, shift_a, day_b, shift_b) in avoid_double_shift_pairs_daywise:
             for p in range(P):
+                if (p, day_a, shift_a) not in assign or (p, day_b, shift_b) not in assign:
+                    continue
                 both = model.NewBoolVar(f"both_p{p}_d{day_a}_{shift_a}_d{day_b}_{shift_b}")
-                model.AddBoolAnd([assign[(p, day_a, shift_a)], assign[(p, day_b, shift_b)]]).OnlyEnforceIf(both)
-                model.AddBoolOr([
-                    assign[(p, day_a, shift_a)].Not(),
-                    assign[(p, day_b, shift_b)].Not()
-                ]).OnlyEnforceIf(both.Not())
+                if penalty_formulation == "tight":
+                    # a and b => both; the penalty keeps both at 0 otherwise
+                    model.AddBoolOr([assign[(p, day_a, shift_a)].Not(), assign[(p, day_b, shift_b)].Not(), both])
+                else:
+                    model.AddBoolAnd([assign[(p, day_a, shift_a)],
+                                      assign[(p, day_b, shift_b)]]).OnlyEnforceIf(both)
+                    model.AddBoolOr([
+                        assign[(p, day_a, shift_a)].Not(),
+                        assign[(p, day_b, shift_b)].Not()
+                    ]).OnlyEnforceIf(both.Not())
                 double_shift_penalties.append(both)
+                double_shift_links.append((both, (p, day_a, shift_a), (p, day_b, shift_b)))
+
+    # 7b) sequence rules: one clause per person, rule and start day
+    compiled_rules = compile_sequence_rules(sequence_rules or [], shift_names)
+    step_literals = {}
+    step_links = []
+    sequence_penalties = []
+    sequence_links = []
+
+    def step_literal(p: int, d: int, step):
+        # True / False when the day can only / never fit the step, else a literal
+        # that is forced true when it fits (clauses only use its negation)
+        key = (p, d, step)
+        if key not in step_literals:
+            cells = [grid[p][d][k] for k in (range(S) if step is None else step) if grid[p][d][k] is not None]
+            if step is None:
+                if not cells:
+                    literal = True
+                elif len(cells) == 1:
+                    literal = cells[0].Not()
+                else:
+                    literal = model.NewBoolVar(f"off_p{p}_d{d}")
+                    model.AddBoolOr(cells + [literal])
+                    step_links.append((literal, p, d, step))
+            elif not cells:
+                literal = False
+            elif len(cells) == 1:
+                literal = cells[0]
+            else:
+                literal = model.NewBoolVar(f"step_p{p}_d{d}_{'_'.join(map(str, step))}")
+                for cell in cells:
+                    model.AddImplication(cell, literal)
+                step_links.append((literal, p, d, step))
+            step_literals[key] = literal
+        return step_literals[key]
+
+    for r, rule in enumerate(compiled_rules):
+        length = len(rule["steps"])
+        for p in range(P):
+            for d in range(num_days - length + 1):
+                literals = [step_literal(p, d + i, step) for i, step in enumerate(rule["steps"])]
+                if any(literal is False for literal in literals):
+                    continue
+                clause = [literal.Not() for literal in literals if literal is not True]
+                if rule["penalty"] is None:
+                    ct = model.AddBoolOr(clause)
+                    if diagnose:
+                        assume(ct, "sequence", f"[Sequence] {rule['name']}: {names[p]} from day {d}")
+                else:
+                    matched = model.NewBoolVar(f"seq{r}_p{p}_d{d}")
+                    model.AddBoolOr(clause + [matched])
+                    sequence_penalties.append((matched, rule["penalty"]))
+                    sequence_links.append((matched, r, p, d))
 
     # 8) soft penalty: prefer at most one shift per person per day
-    multi_shift_penalties = []
-    for p in range(P):
-        for d in range(num_days):
-            shifts_today = [assign[(p, d, s)] for s in shift_names]
-            # number of assigned shifts that day
-            total_today = sum(shifts_today)
-            # penalize each shift beyond the first
-            # (since BoolVars, this expression is linear)
-            excess_expr = total_today - 1
-            # only positive part should be penalized
-            # but CP-SAT doesn't have max(), so we just rely on objective minimizing this
-            # because excess_expr will be 0 if <=1, >0 if more
-            multi_shift_penalties.append(excess_expr)
-
+    # linear: sum over person-days of (shifts that day - 1) = (all live vars) - P * num_days,
+    # so every live var gets the same weight and the -1s fold into a constant
+    # tight: one excess variable per person-day that could hold two shifts
+    excess_links = []
+    if penalty_formulation == "tight":
+        multi_shift_vars = []
+        multi_shift_offset = 0
+        # largest set of live shifts that fit on one day under the encoded rest rule
+        most_shifts = same_day_capacity(shift_time_map, min_rest_hours, rest_formulation)
+        for p in range(P):
+            for d in range(num_days):
+                row = grid[p][d]
+                mask = sum(1 << k for k in range(S) if row[k] is not None)
+                fit = most_shifts(mask)
+                if fit < 2:
+                    continue
+                excess = model.NewIntVar(0, fit - 1, f"excess_p{p}_d{d}")
+                model.Add(LinearExpr.Sum([v for v in row if v is not None]) <= 1 + excess)
+                multi_shift_vars.append(excess)
+                excess_links.append((excess, p, d))
+    else:
+        multi_shift_vars = list(assign.values())
+        multi_shift_offset = P * num_days
 
     # balancing term
-    max_shifts_var = model.NewIntVar(0, num_days * len(shift_names), "max_shifts")
+    max_shifts_var = model.NewIntVar(0, num_days * S, "max_shifts")
     for p in range(P):
-        model.Add(sum(assign[(p, d, s)] for d in range(num_days) for s in shift_names) <= max_shifts_var)
+        model.Add(person_totals[p] <= max_shifts_var)
+
+    sequence_vars = [matched for matched, _ in sequence_penalties]
+    sequence_coeffs = [-penalty for _, penalty in sequence_penalties]
+    objective_vars = (preference_terms + [max_shifts_var] + double_shift_penalties + multi_shift_vars
+                      + sequence_vars)
+    objective_coeffs = (preference_coeffs
+                        + [-1]
+                        + [-double_shift_penalty_weight] * len(double_shift_penalties)
+                        + [-soft_single_shift_weight] * len(multi_shift_vars)
+                        + sequence_coeffs)
+    for short, over in coverage_slack.values():
+        objective_vars += [short, over]
+        objective_coeffs += [-coverage_penalty_weight, -coverage_penalty_weight]
+    objective = (LinearExpr.WeightedSum(objective_vars, objective_coeffs)
+                 + soft_single_shift_weight * multi_shift_offset)
+    model.Maximize(objective)
+
+    # the same terms one priority level at a time (each to maximize), for solve_shift_model_staged
+    objective_stages = []
+    if coverage_slack:
+        objective_stages.append(("coverage", -LinearExpr.Sum([v for pair in coverage_slack.values() for v in pair])))
+    objective_stages += [
+        ("preferences", LinearExpr.WeightedSum(preference_terms, [c // 1000 for c in preference_coeffs])),
+        ("max_load", -max_shifts_var),
+        ("penalties", LinearExpr.WeightedSum(
+            double_shift_penalties + multi_shift_vars + sequence_vars,
+            [-double_shift_penalty_weight] * len(double_shift_penalties)
+            + [-soft_single_shift_weight] * len(multi_shift_vars)
+            + sequence_coeffs) + soft_single_shift_weight * multi_shift_offset),
+    ]
+
+    return {
+        "model": model,
+        "assign": assign,
+        "grid": grid,
+        "names": list(names),
+        "shift_names": shift_names,
+        "num_days": num_days,
+        "max_shifts_var": max_shifts_var,
+        "double_shift_links": double_shift_links,
+        "excess_links": excess_links,
+        "sequence_rules": compiled_rules,
+        "step_links": step_links,
+        "sequence_links": sequence_links,
+        "avoid_double_shift_pairs_daywise": list(avoid_double_shift_pairs_daywise or []),
+        "objective": objective,
+        "objective_stages": objective_stages,
+        "required": required,
+        "coverage_slack": coverage_slack,
+        "symmetry_classes": symmetry_classes,
+        "lex_links": lex_links,
+        "assumptions": assumptions,
+        "build_seconds": time.perf_counter() - build_start,
+    }
+
+# --------------------------
+# Schedule reports
+# --------------------------
+def schedule_status(solution: Dict[Tuple[str, int, str], int], names: List[str], shift_names: List[str],
+                    num_days: int, avoid_double_shift_pairs_daywise: List[Tuple[int, str, int, str]] = None):
+    """double_shift_status and multi_shift_status of plan_shifts' result for a schedule (dict or Schedule)."""
+    schedule = as_schedule(solution, names, shift_names, num_days)
+    # ---- check for double-shift occurrences ----
+    double_shift_status = []
+    if avoid_double_shift_pairs_daywise:
+        for (day_a, shift_a, day_b, shift_b) in avoid_double_shift_pairs_daywise:
+            violators = []
+            for p, person_name in enumerate(names):
+                if schedule.get((person_name, day_a, shift_a)) and schedule.get((person_name, day_b, shift_b)):
+                    violators.append(person_name)
+            double_shift_status.append({
+                "pair": (day_a, shift_a, day_b, shift_b),
+                "violators": violators
+            })
+
+    multi_shift_status = []
+    by_person = {}
+    for p, d in np.argwhere(schedule.data.sum(axis=2) > 1):
+        shifts_today = [shift_names[k] for k in np.flatnonzero(schedule.data[p, d])]
+        by_person.setdefault(int(p), []).append((int(d), shifts_today))
+    for p, multi_days in by_person.items():
+        multi_shift_status.append({"person": names[p], "days": multi_days})
+    return double_shift_status, multi_shift_status
+
+
+def coverage_status(solution, required: np.ndarray, names: List[str], shift_names: List[str],
+                    num_days: int) -> List[dict]:
+    """(day, shift) cells of a schedule whose head count differs from required (a D x S array)."""
+    schedule = as_schedule(solution, names, shift_names, num_days)
+    assigned = schedule.data.sum(axis=0, dtype=np.int64)
+    status = []
+    for d, k in np.argwhere(assigned != required):
+        diff = int(assigned[d, k] - required[d, k])
+        status.append({
+            "day": int(d),
+            "shift": shift_names[k],
+            "required": int(required[d, k]),
+            "assigned": int(assigned[d, k]),
+            "short": max(0, -diff),
+            "over": max(0, diff),
+        })
+    return status
+
+
+def schedule_objective(solution: Dict[Tuple[str, int, str], int], names: List[str],
+                       shift_requests: List[List[List[int]]], STANDARD_SHIFTS: List[str],
+                       shift_time_map: Dict[str, List[Tuple[float, float]]], num_days: int,
+                       avoid_double_shift_pairs_daywise: List[Tuple[int, str, int, str]] = None,
+                       double_shift_penalty_weight: int = 50,
+                       soft_single_shift_weight: int = 20,
+                       penalty_formulation: str = "linear",
+                       sequence_rules: List[dict] = None) -> float:
+    """Value of plan_shifts' objective for a schedule (dict or Schedule) built some other way."""
+    shift_names = list(shift_time_map)
+    schedule = as_schedule(solution, names, shift_names, num_days)
+    _, preferred = request_masks(shift_requests, STANDARD_SHIFTS, shift_time_map, num_days)
+    preferences = int((schedule.data * preferred).sum())
+    double_shift_status, _ = schedule_status(schedule, names, shift_names, num_days,
+                                             avoid_double_shift_pairs_daywise)
+    doubles = sum(len(entry["violators"]) for entry in double_shift_status)
+    counts = schedule.data.sum(axis=(1, 2))
+    if penalty_formulation == "tight":
+        excess = int(np.maximum(schedule.data.sum(axis=2, dtype=np.int64) - 1, 0).sum())
+    else:
+        excess = int(counts.sum()) - len(names) * num_days
+    sequences = sum(rule["penalty"] * int(sequence_matches(schedule.data, rule).sum())
+                    for rule in compile_sequence_rules(sequence_rules or [], shift_names)
+                    if rule["penalty"] is not None)
+    return float(1000 * preferences - int(counts.max(initial=0))
+                 - double_shift_penalty_weight * doubles - soft_single_shift_weight * excess - sequences)
+
+# --------------------------
+# Solution hints
+# --------------------------
+def add_solution_hint(built: dict, hint_solution: Dict[Tuple[str, int, str], int]) -> set:
+    """
+    Hint a previous {(name, day, shift): 1} schedule on a model from build_shift_model.
+
+    Every live cell is hinted (1 if present in hint_solution, else 0) and the
+    auxiliary variables (penalty links, coverage slack, sequence steps,
+    symmetry-breaking prefixes, max load) are hinted with the values the
+    schedule implies, so CP-SAT receives a complete hint. Cells that do not
+    exist in the model (unknown person/shift, day out of range, forbidden
+    cell) are dropped.
+    Returns the (p, d, s) keys that were hinted to 1.
+    """
+    model = built["model"]
+    name_to_idx = {n: i for i, n in enumerate(built["names"])}
+    hinted = set()
+    for (name, d, s), v in hint_solution.items():
+        key = (name_to_idx.get(name), d, s)
+        if v and key in built["assign"]:
+            hinted.add(key)
+
+    counts = [0] * len(built["names"])
+    for key, var in built["assign"].items():
+        value = 1 if key in hinted else 0
+        model.AddHint(var, value)
+        counts[key[0]] += value
+    for both, key_a, key_b in built["double_shift_links"]:
+        model.AddHint(both, 1 if key_a in hinted and key_b in hinted else 0)
+    per_day = {}
+    for (p, d, _) in hinted:
+        per_day[(p, d)] = per_day.get((p, d), 0) + 1
+    for excess, p, d in built["excess_links"]:
+        model.AddHint(excess, max(0, per_day.get((p, d), 0) - 1))
+    if built["step_links"] or built["sequence_links"]:
+        data = Schedule(built["names"], built["shift_names"], built["num_days"]).data
+        for (p, d, s) in hinted:
+            data[p, d, built["shift_names"].index(s)] = 1
+        for literal, p, d, step in built["step_links"]:
+            model.AddHint(literal, int(sequence_step_days(data[p:p + 1, d:d + 1], step)[0, 0]))
+        matches = [sequence_matches(data, rule) for rule in built["sequence_rules"]]
+        for matched, r, p, d in built["sequence_links"]:
+            model.AddHint(matched, int(matches[r][p, d]))
+    if built["coverage_slack"]:
+        per_cell = {}
+        for (_, d, s) in hinted:
+            per_cell[(d, s)] = per_cell.get((d, s), 0) + 1
+        for (d, s), (short, over) in built["coverage_slack"].items():
+            req = int(built["required"][d, built["shift_names"].index(s)])
+            n = per_cell.get((d, s), 0)
+            model.AddHint(short, max(0, req - n))
+            model.AddHint(over, max(0, n - req))
+    if built["lex_links"]:
+        grid, shift_names = built["grid"], built["shift_names"]
+
+        def live_values(p):
+            return [(p, d, shift_names[k]) in hinted
+                    for d, row in enumerate(grid[p]) for k, v in enumerate(row) if v is not None]
+
+        for prefixes, p, q in built["lex_links"]:
+            equal = True
+            for literal, x, y in zip(prefixes, live_values(p), live_values(q)):
+                equal = equal and x == y
+                model.AddHint(literal, int(equal))
+    model.AddHint(built["max_shifts_var"], max(counts, default=0))
+    return hinted
+
+
+class _ProgressWatcher(cp_model.CpSolverSolutionCallback):
+    """
+    Streams solver progress and records the improvement curve.
+
+    Every improving solution and every best-bound improvement becomes an event
+    {"event": "solution" | "bound", "wall_time", "objective", "best_bound",
+    "gap", "num_solutions"} that is appended to `curve` and passed to
+    progress_callback. Also records whether the first solution is exactly the
+    hinted schedule.
+    """
+
+    def __init__(self, assign: dict, hinted: set = None, progress_callback: Callable[[dict], None] = None):
+        super().__init__()
+        self._assign = assign
+        self._hinted = hinted
+        self._progress_callback = progress_callback
+        self._start = time.perf_counter()
+        self.curve = []
+        self.num_solutions = 0
+        self.objective = None
+        self.best_bound = None
+        self.first_solution_seconds = None
+        self.first_solution_is_hint = False
+
+    def _emit(self, event: str, wall_time: float):
+        gap = None
+        if self.objective is not None and self.best_bound is not None:
+            gap = abs(self.best_bound - self.objective) / max(1.0, abs(self.objective))
+        entry = {
+            "event": event,
+            "wall_time": wall_time,
+            "objective": self.objective,
+            "best_bound": self.best_bound,
+            "gap": gap,
+            "num_solutions": self.num_solutions,
+        }
+        self.curve.append(entry)
+        if self._progress_callback is not None:
+            self._progress_callback(entry)
+
+    def on_solution_callback(self):
+        self.num_solutions += 1
+        self.objective = self.ObjectiveValue()
+        self.best_bound = self.BestObjectiveBound()
+        if self.first_solution_seconds is None:
+            self.first_solution_seconds = self.WallTime()
+            if self._hinted is not None:
+                self.first_solution_is_hint = all(
+                    bool(self.Value(var)) == (key in self._hinted) for key, var in self._assign.items())
+        self._emit("solution", self.WallTime())
+
+    def on_best_bound(self, bound: float):
+        self.best_bound = bound
+        self._emit("bound", time.perf_counter() - self._start)
+
+# --------------------------
+# Feasibility pre-check
+# --------------------------
+class InfeasibleRosterError(ValueError):
+    """Raised by plan_shifts when check_feasibility proves the roster infeasible."""
+
+    def __init__(self, reasons: List[str]):
+        self.reasons = list(reasons)
+        super().__init__("Roster is infeasible:\n" + "\n".join(self.reasons))
+
 
-    model.Maximize(
-        1000 * sum(preference_terms)
-        - max_shifts_var
-        - double_shift_penalty_weight * sum(double_shift_penalties)
-        - soft_single_shift_weight * sum(multi_shift_penalties)
+def forbidden_mask(shift_requests, STANDARD_SHIFTS: List[str],
+                   shift_time_map: Dict[str, List[Tuple[float, float]]], num_days: int) -> np.ndarray:
+    """P x D x S bool array of cells plan_shifts never assigns (overlapping a -1 standard shift)."""
+    return request_masks(shift_requests, STANDARD_SHIFTS, shift_time_map, num_days)[0]
+
+
+def _max_flow(num_nodes: int, tails, heads, capacities, source: int, sink: int):
+    flow = max_flow.SimpleMaxFlow()
+    arcs = flow.add_arcs_with_capacity(np.asarray(tails, dtype=np.int32), np.asarray(heads, dtype=np.int32),
+                                       np.asarray(capacities, dtype=np.int64))
+    if num_nodes and flow.solve(source, sink) != flow.OPTIMAL:
+        raise RuntimeError("max-flow solve failed")
+    return flow.optimal_flow(), flow.flows(arcs)
+
+
+def check_feasibility(
+    names: List[str],
+    shift_requests: List[List[List[int]]],
+    STANDARD_SHIFTS: List[str],
+    shift_time_map: Dict[str, List[Tuple[float, float]]],
+    target_shifts: Dict[str, int],
+    num_days: int = None,
+    shift_requirements: Union[int, Dict[str, Union[int, List[int]]]] = 1,
+    min_shifts_per_person: Union[int, List[int]] = 0,
+    max_shifts_per_person: Union[int, List[int]] = 999,
+    min_rest_hours: float = 8.0,
+    coverage_mode: str = "strict",
+    rest_formulation: str = "pairwise",
+) -> List[str]:
+    """
+    Fast necessary conditions for plan_shifts' hard constraints; returns the
+    reasons the roster is infeasible (empty if none was found).
+
+    Checked in order, each as a bipartite relaxation (people -> open seats):
+      [Quota] / [Target] - min > max, or a target_shifts entry outside min..max
+      [Coverage]         - a (day, shift) needs more people than are open for it
+      [Min shifts]       - a person's open cells cannot reach their minimum
+      [Day]              - max flow of one day's seats, each person capped by
+                           the most same-day shifts the rest rule allows as
+                           rest_formulation encodes it (see same_day_capacity)
+      [Horizon]          - flow over the whole horizon with every person's
+                           min/max as lower/upper bounds
+    Rest between days and the soft penalties are not modelled, so passing the
+    check does not guarantee a schedule. With coverage_mode="elastic" seats
+    are soft, so only [Quota], [Target] and [Min shifts] apply.
+    """
+    if rest_formulation not in REST_FORMULATIONS:
+        raise ValueError(f"Unknown rest_formulation '{rest_formulation}', expected one of {REST_FORMULATIONS}")
+    P = len(names)
+    if num_days is None:
+        num_days = len(shift_requests[0])
+    # longer rows are fine (only the first num_days days are planned), shorter ones are not
+    short_rows = [names[p] for p in range(P) if len(shift_requests[p]) < num_days]
+    if short_rows:
+        raise ValueError(f"shift_requests rows of {short_rows} have fewer than num_days={num_days} days")
+    shift_names = list(shift_time_map)
+    S = len(shift_names)
+    min_shifts = person_limits(min_shifts_per_person, P)
+    max_shifts = person_limits(max_shifts_per_person, P)
+
+    # 1) quota contradictions
+    reasons = []
+    lo, hi = list(min_shifts), list(max_shifts)
+    for p, name in enumerate(names):
+        if lo[p] > hi[p]:
+            reasons.append(f"[Quota] {name}: min {lo[p]} > max {hi[p]}")
+        if name in target_shifts:
+            target = target_shifts[name]
+            if not lo[p] <= target <= hi[p]:
+                reasons.append(f"[Target] {name}: target {target} outside min {lo[p]} .. max {hi[p]}")
+            lo[p] = hi[p] = target
+    if reasons:
+        return reasons
+
+    required = requirement_grid(shift_requirements, shift_names, num_days)
+    open_cells = ~forbidden_mask(shift_requests, STANDARD_SHIFTS, shift_time_map, num_days)
+    open_cells &= (np.asarray(hi) > 0).reshape(P, 1, 1)
+
+    # 2) single seats
+    available = open_cells.sum(axis=0)
+    for d, k in np.argwhere((available < required) & (coverage_mode == "strict")):
+        reasons.append(f"[Coverage] Day {d}, shift {shift_names[k]}: "
+                       f"required={required[d, k]}, available={available[d, k]}")
+
+    # most shifts a person can work on one day: max independent set of the
+    # same-day rest conflicts among their open shifts
+    most_shifts = same_day_capacity(shift_time_map, min_rest_hours, rest_formulation)
+    bits = [1 << k for k in range(S)]
+    masks = open_cells.astype(object) @ np.array(bits, dtype=object) if S else np.zeros((P, num_days), dtype=object)
+    unique_masks, inverse = np.unique(masks.reshape(-1), return_inverse=True)
+    day_cap = np.array([most_shifts(int(mask)) for mask in unique_masks], dtype=np.int64)[inverse]
+    day_cap = day_cap.reshape(P, num_days)
+    person_cap = np.minimum(day_cap.sum(axis=1), np.asarray(hi, dtype=np.int64))
+
+    # 3) minimum per person
+    for p in np.flatnonzero(day_cap.sum(axis=1) < np.asarray(lo)):
+        reasons.append(f"[Min shifts] {names[p]}: min {lo[p]}, but only {day_cap[p].sum()} shifts are open")
+    if coverage_mode == "elastic":
+        return reasons
+
+    # 4) one day at a time: source -> person (day cap) -> open seat -> sink (required)
+    for d in range(num_days):
+        need = int(required[d].sum())
+        if need == 0:
+            continue
+        pp, kk = np.nonzero(open_cells[:, d, :])
+        source, sink = P + S, P + S + 1
+        tails = np.concatenate([np.full(P, source), pp, P + np.arange(S)])
+        heads = np.concatenate([np.arange(P), P + kk, np.full(S, sink)])
+        caps = np.concatenate([np.minimum(day_cap[:, d], person_cap), np.ones(len(pp), dtype=np.int64), required[d]])
+        filled, _ = _max_flow(P + S + 2, tails, heads, caps, source, sink)
+        if filled < need:
+            reasons.append(f"[Day] Day {d}: at most {filled} of {need} required seats can be filled")
+    if reasons:
+        return reasons
+
+    # 5) whole horizon, with min/max as lower/upper bounds on person flow.
+    # Lower bounds are removed the usual way: an edge u -> v with lower bound l
+    # becomes capacity (upper - l) plus demand l at v and supply l at u, served
+    # from a super source/sink; seats are exact (lower = upper = required).
+    pp, dd, kk = np.nonzero(open_cells)
+    cells = num_days * S
+    source, sink, super_source, super_sink = P + cells, P + cells + 1, P + cells + 2, P + cells + 3
+    lower = np.minimum(np.asarray(lo, dtype=np.int64), person_cap)
+    excess = np.zeros(P + cells + 2, dtype=np.int64)
+    excess[:P] += lower
+    excess[source] -= lower.sum()
+    excess[P:P + cells] -= required.reshape(-1)
+    excess[sink] += required.sum()
+    total_seats = int(required.sum())
+    tails = [np.full(P, source), pp, [sink]]
+    heads = [np.arange(P), P + dd * S + kk, [source]]
+    caps = [person_cap - lower, np.ones(len(pp), dtype=np.int64), [total_seats + int(person_cap.sum())]]
+    nodes = np.arange(P + cells + 2)
+    tails += [np.full(int((excess > 0).sum()), super_source), nodes[excess < 0]]
+    heads += [nodes[excess > 0], np.full(int((excess < 0).sum()), super_sink)]
+    caps += [excess[excess > 0], -excess[excess < 0]]
+    flow, _ = _max_flow(P + cells + 4, np.concatenate(tails), np.concatenate(heads), np.concatenate(caps),
+                        super_source, super_sink)
+    if flow < excess[excess > 0].sum():
+        upper, _ = _max_flow(P + cells + 2,
+                             np.concatenate([np.full(P, source), pp, P + np.arange(cells)]),
+                             np.concatenate([np.arange(P), P + dd * S + kk, np.full(cells, sink)]),
+                             np.concatenate([person_cap, np.ones(len(pp), dtype=np.int64), required.reshape(-1)]),
+                             source, sink)
+        if upper < total_seats:
+            reasons.append(f"[Horizon] at most {upper} of {total_seats} required seats can be filled "
+                           f"within everyone's max shifts")
+        else:
+            reasons.append(f"[Horizon] the {total_seats} required seats cannot give everyone their "
+                           f"min shifts (sum of mins = {int(lower.sum())})")
+    return reasons
+
+# --------------------------
+# Infeasibility diagnosis
+# --------------------------
+def diagnose_infeasibility(
+    names: List[str],
+    shift_requests: List[List[List[int]]],
+    STANDARD_SHIFTS: List[str],
+    shift_time_map: Dict[str, List[Tuple[float, float]]],
+    target_shifts: Dict[str, int],
+    num_days: int = None,
+    shift_requirements: Union[int, Dict[str, Union[int, List[int]]]] = 1,
+    min_shifts_per_person: Union[int, List[int]] = 0,
+    max_shifts_per_person: Union[int, List[int]] = 999,
+    min_rest_hours: float = 8.0,
+    time_limit_seconds: int = 20,
+    num_search_workers: int = 8,
+    coverage_mode: str = "strict",
+    sequence_rules: List[dict] = None,
+) -> dict:
+    """
+    Name a small set of hard constraints that cannot hold together.
+
+    The model is built with diagnose=True (one assumption literal per coverage
+    cell, person min/max/target, rest pair and forbidden sequence match) and
+    solved once without an
+    objective. If it is infeasible, CP-SAT's sufficient assumptions for
+    infeasibility give the core: constraints that are already contradictory
+    on their own (not necessarily a minimal set). Cells marked -1 are data,
+    not constraints, so they never appear in it.
+
+    Returns {"status", "core" (readable descriptions), "core_families",
+    "num_assumptions", "seconds"}; "core" is empty unless status is INFEASIBLE.
+    """
+    start = time.perf_counter()
+    built = build_shift_model(
+        names, shift_requests, STANDARD_SHIFTS, shift_time_map, target_shifts,
+        num_days=num_days,
+        shift_requirements=shift_requirements,
+        min_shifts_per_person=min_shifts_per_person,
+        max_shifts_per_person=max_shifts_per_person,
+        min_rest_hours=min_rest_hours,
+        diagnose=True,
+        coverage_mode=coverage_mode,
+        sequence_rules=sequence_rules,
     )
+    model = built["model"]
+    model.ClearObjective()
 
-    # solve
     solver = cp_model.CpSolver()
     solver.parameters.max_time_in_seconds = time_limit_seconds
-    solver.parameters.num_search_workers = 8
+    solver.parameters.num_search_workers = num_search_workers
     result = solver.Solve(model)
 
+    core = []
+    if result == cp_model.INFEASIBLE:
+        core = [built["assumptions"][i] for i in solver.SufficientAssumptionsForInfeasibility()]
+    families = {}
+    for family, _ in core:
+        families[family] = families.get(family, 0) + 1
+    return {
+        "status": solver.StatusName(result),
+        "core": [description for _, description in core],
+        "core_families": families,
+        "num_assumptions": len(built["assumptions"]),
+        "seconds": time.perf_counter() - start,
+    }
+
+# --------------------------
+# Core function
+# --------------------------
+def plan_shifts(
+    names: List[str],
+    shift_requests: List[List[List[int]]],     # shape: [persons][days][4 standard shifts]
+    STANDARD_SHIFTS: List[str],                # ordered 4 standard shift names
+    shift_time_map: Dict[str, List[Tuple[float, float]]],  # shift_name -> list of (start_hr, end_hr)
+    target_shifts: Dict[str, int],
+    num_days: int = None,
+    shift_requirements: Union[int, Dict[str, Union[int, List[int]]]] = 1,
+    min_shifts_per_person: Union[int, List[int]] = 0,
+    max_shifts_per_person: Union[int, List[int]] = 999,
+    min_rest_hours: float = 8.0,
+    time_limit_seconds: int = 20,
+    avoid_double_shift_pairs_daywise: List[Tuple[int, str, int, str]] = None,
+    double_shift_penalty_weight: int = 50,
+    soft_single_shift_weight: int = 20,
+    rest_formulation: str = "pairwise",
+    hint_solution: Dict[Tuple[str, int, str], int] = None,
+    repair_hint: bool = False,
+    progress_callback: Callable[[dict], None] = None,
+    num_search_workers: int = 8,
+    solver_parameters: dict = None,
+    precheck: bool = True,
+    diagnose: bool = False,
+    coverage_mode: str = "strict",
+    coverage_penalty_weight: int = 100000,
+    symmetry_breaking: bool = False,
+    penalty_formulation: str = "linear",
+    objective_mode: str = "weighted",
+    stage_time_limits: Dict[str, float] = None,
+    sequence_rules: List[dict] = None,
+):
+    """
+    See build_shift_model for rest_formulation, coverage_mode,
+    penalty_formulation and sequence_rules (matches are reported in the
+    result's "sequence_status"). objective_mode="staged" replaces the weighted sum by
+    solve_shift_model_staged (preferences, then max load, then penalties; an
+    elastic coverage stage comes first), each stage with its own budget from
+    stage_time_limits; stages not listed split the rest of time_limit_seconds. The result's
+    "coverage_status" lists every (day, shift) that is short or over (always
+    empty with the default coverage_mode="strict"). symmetry_breaking=True
+    orders the schedules of interchangeable people (same shift_requests row
+    and min/max, no target); the objective is unchanged, but which of several
+    equivalent schedules comes back may differ. CP-SAT's presolve already
+    detects much of this symmetry, so it is off by default; measure with
+    V2_Benchmark.benchmark_symmetry_breaking before turning it on.
+
+    With precheck=True (default) check_feasibility runs first and an
+    InfeasibleRosterError listing its reasons is raised, before any model is
+    built, when the roster cannot be scheduled. With diagnose=True a solve
+    that finds no schedule is followed by diagnose_infeasibility, and if the
+    model is proven infeasible an InfeasibleRosterError listing the conflicting
+    constraints is raised instead of returning None.
+
+    progress_callback, when given, is called with a progress event (wall time,
+    objective, best bound, gap, number of solutions) for every improving
+    solution and bound; the result's "improvement_curve" holds all events.
+
+    hint_solution is a previous schedule in the {(name, day, shift): 1} form that
+    plan_shifts returns (or build_solution_dict builds); it is passed to CP-SAT
+    as a solution hint. With repair_hint=True CP-SAT first tries to repair an
+    infeasible hint before falling back to regular search; CP-SAT only repairs
+    hints single-threaded, so that solve runs on one worker whatever
+    num_search_workers says. The result's "hint_stats" tells whether the hint
+    was accepted as the first solution.
+    """
+    if objective_mode not in OBJECTIVE_MODES:
+        raise ValueError(f"Unknown objective_mode '{objective_mode}', expected one of {OBJECTIVE_MODES}")
+    if precheck:
+        reasons = check_feasibility(
+            names, shift_requests, STANDARD_SHIFTS, shift_time_map, target_shifts,
+            num_days=num_days,
+            shift_requirements=shift_requirements,
+            min_shifts_per_person=min_shifts_per_person,
+            max_shifts_per_person=max_shifts_per_person,
+            min_rest_hours=min_rest_hours,
+            coverage_mode=coverage_mode,
+            rest_formulation=rest_formulation,
+        )
+        if reasons:
+            raise InfeasibleRosterError(reasons)
+
+    built = build_shift_model(
+        names, shift_requests, STANDARD_SHIFTS, shift_time_map, target_shifts,
+        num_days=num_days,
+        shift_requirements=shift_requirements,
+        min_shifts_per_person=min_shifts_per_person,
+        max_shifts_per_person=max_shifts_per_person,
+        min_rest_hours=min_rest_hours,
+        avoid_double_shift_pairs_daywise=avoid_double_shift_pairs_daywise,
+        double_shift_penalty_weight=double_shift_penalty_weight,
+        soft_single_shift_weight=soft_single_shift_weight,
+        rest_formulation=rest_formulation,
+        coverage_mode=coverage_mode,
+        coverage_penalty_weight=coverage_penalty_weight,
+        symmetry_breaking=symmetry_breaking,
+        penalty_formulation=penalty_formulation,
+        sequence_rules=sequence_rules,
+    )
+    if objective_mode == "staged":
+        out = solve_shift_model_staged(built, stage_time_limits, time_limit_seconds, hint_solution=hint_solution,
+                                       repair_hint=repair_hint, progress_callback=progress_callback,
+                                       num_search_workers=num_search_workers, solver_parameters=solver_parameters)
+    else:
+        out = solve_shift_model(built, time_limit_seconds, hint_solution=hint_solution, repair_hint=repair_hint,
+                                progress_callback=progress_callback, num_search_workers=num_search_workers,
+                                solver_parameters=solver_parameters)
+    if out is None and diagnose:
+        diagnosis = diagnose_infeasibility(
+            names, shift_requests, STANDARD_SHIFTS, shift_time_map, target_shifts,
+            num_days=num_days,
+            shift_requirements=shift_requirements,
+            min_shifts_per_person=min_shifts_per_person,
+            max_shifts_per_person=max_shifts_per_person,
+            min_rest_hours=min_rest_hours,
+            time_limit_seconds=time_limit_seconds,
+            num_search_workers=num_search_workers,
+            coverage_mode=coverage_mode,
+            sequence_rules=sequence_rules,
+        )
+        if diagnosis["core"]:
+            raise InfeasibleRosterError(diagnosis["core"])
+    return out
+
+
+def solve_shift_model(built: dict, time_limit_seconds: int = 20,
+                      hint_solution: Dict[Tuple[str, int, str], int] = None,
+                      repair_hint: bool = False,
+                      progress_callback: Callable[[dict], None] = None,
+                      num_search_workers: int = 8,
+                      solver_parameters: dict = None):
+    """Solve a model from build_shift_model and return plan_shifts' result dict (or None)."""
+    model = built["model"]
+    assign = built["assign"]
+    names = built["names"]
+    shift_names = built["shift_names"]
+    num_days = built["num_days"]
+    avoid_double_shift_pairs_daywise = built["avoid_double_shift_pairs_daywise"]
+
+    hint_stats = None
+    hinted = None
+    if hint_solution:
+        hinted = add_solution_hint(built, hint_solution)
+        hint_cells = {key for key, v in hint_solution.items() if v}
+        hint_stats = {"hinted_cells": len(hinted), "dropped_cells": len(hint_cells) - len(hinted)}
+
+    # solve
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit_seconds
+    solver.parameters.num_search_workers = num_search_workers
+    for key, value in (solver_parameters or {}).items():
+        setattr(solver.parameters, key, value)
+    if hint_solution and repair_hint:
+        # hint repair is single-threaded in CP-SAT; more workers abort in C++
+        solver.parameters.repair_hint = True
+        solver.parameters.num_search_workers = 1
+        solver.parameters.num_workers = 0
+    watcher = _ProgressWatcher(assign, hinted, progress_callback)
+    solver.best_bound_callback = watcher.on_best_bound
+    result = solver.Solve(model, watcher)
+
+    proto = model.Proto()
+    model_stats = {
+        "num_variables": len(proto.variables),
+        "num_constraints": len(proto.constraints),
+        "build_seconds": built["build_seconds"],
+        "solve_seconds": solver.WallTime(),
+        "first_solution_seconds": watcher.first_solution_seconds,
+        "num_solutions": watcher.num_solutions,
+        "objective_value": solver.ObjectiveValue(),
+        "best_bound": solver.BestObjectiveBound(),
+    }
+
     if result in (cp_model.OPTIMAL, cp_model.FEASIBLE):
         solution = {}
-        shift_counts = {names[p]: 0 for p in range(P)}
-        for p in range(P):
-            for d in range(num_days):
-                for s in shift_names:
-                    if solver.Value(assign[(p, d, s)]):
-                        solution[(names[p], d, s)] = 1
-                        shift_counts[names[p]] += 1
-
-        # ---- check for double-shift occurrences ----
-        double_shift_status = []
-        if avoid_double_shift_pairs_daywise:
-            for (day_a, shift_a, day_b, shift_b) in avoid_double_shift_pairs_daywise:
-                violators = []
-                for p, person_name in enumerate(names):
-                    val_a = solver.Value(assign[(p, day_a, shift_a)])
-                    val_b = solver.Value(assign[(p, day_b, shift_b)])
-                    if val_a and val_b:
-                        violators.append(person_name)
-                if violators:
-                    double_shift_status.append({
-                        "pair": (day_a, shift_a, day_b, shift_b),
-                        "violators": violators
-                    })
-                else:
-                    double_shift_status.append({
-                        "pair": (day_a, shift_a, day_b, shift_b),
-                        "violators": []
-                    })
-
-        multi_shift_status = []
-        for p, person_name in enumerate(names):
-            multi_days = []
-            for d in range(num_days):
-                shifts_today = [s for s in shift_names if solver.Value(assign[(p, d, s)])]
-                if len(shifts_today) > 1:
-                    multi_days.append((d, shifts_today))
-            if multi_days:
-                multi_shift_status.append({"person": person_name, "days": multi_days})
+        schedule = Schedule(names, shift_names, num_days)
+        shift_to_idx = schedule.shift_to_idx
+        shift_counts = {name: 0 for name in names}
+        for (p, d, s), var in assign.items():
+            if solver.Value(var):
+                solution[(names[p], d, s)] = 1
+                schedule.data[p, d, shift_to_idx[s]] = 1
+                shift_counts[names[p]] += 1
+
+        double_shift_status, multi_shift_status = schedule_status(
+            schedule, names, shift_names, num_days, avoid_double_shift_pairs_daywise)
+        coverage_report = coverage_status(schedule, built["required"], names, shift_names, num_days)
+        sequence_report = sequence_status(schedule, names, shift_names, num_days, built["sequence_rules"])
 
         # Add to return
-        return {
+        out = {
             "status": solver.StatusName(result),
             "solution": solution,
+            "schedule": schedule,
             "shift_counts": shift_counts,
-            "objective": solver.ObjectiveValue(),
+            "objective": float(solver.Value(built["objective"])),
             "double_shift_status": double_shift_status,
-            "multi_shift_status": multi_shift_status
+            "multi_shift_status": multi_shift_status,
+            "coverage_status": coverage_report,
+            "sequence_status": sequence_report,
+            "model_stats": model_stats,
+            "improvement_curve": watcher.curve,
         }
+        if hint_stats is not None:
+            hint_stats["accepted"] = watcher.first_solution_is_hint
+            hint_stats["changed_cells"] = len(hint_cells ^ set(solution))
+            out["hint_stats"] = hint_stats
+        return out
     else:
         return None
 
 
+def solve_shift_model_staged(built: dict, stage_time_limits: Dict[str, float] = None,
+                             time_limit_seconds: float = 20,
+                             hint_solution: Dict[Tuple[str, int, str], int] = None,
+                             repair_hint: bool = False,
+                             progress_callback: Callable[[dict], None] = None,
+                             num_search_workers: int = 8,
+                             solver_parameters: dict = None):
+    """
+    Solve a model from build_shift_model one objective stage at a time.
+
+    Each of built["objective_stages"] is maximized in turn, then the value it
+    reached is kept as a constraint (term >= value) for the stages after it,
+    and the next stage is hinted with its schedule. stage_time_limits maps a
+    stage name to seconds (unknown names raise ValueError); stages not listed
+    share what is left of time_limit_seconds evenly. A stage stopped by its
+    time limit is fixed at its best value, so the result is only
+    lexicographically optimal when every stage is OPTIMAL. The model is
+    modified in place.
+
+    Returns plan_shifts' result dict for the last schedule found (its
+    "objective" is the weighted objective, for comparison) with a "stages"
+    list of {"stage", "status", "value", "bound", "seconds"}, or None if the
+    first stage finds no schedule. "improvement_curve" chains the stages'
+    events, each tagged with its "stage" (objective and best_bound are the
+    stage's term, wall_time runs from the first stage). In "model_stats",
+    solve_seconds and num_solutions add up all stages, first_solution_seconds
+    is the first stage's and objective_value / best_bound are the last
+    stage's.
+    """
+    model = built["model"]
+    stages = built["objective_stages"]
+    stage_names = [name for name, _ in stages]
+    limits = dict(stage_time_limits or {})
+    unknown = sorted(set(limits) - set(stage_names))
+    if unknown:
+        raise ValueError(f"Unknown stages {unknown} in stage_time_limits, expected some of {stage_names}")
+    unlisted = [name for name in stage_names if name not in limits]
+    if unlisted:
+        left = time_limit_seconds - sum(limits.values())
+        if left <= 0:
+            raise ValueError(f"stage_time_limits use up time_limit_seconds={time_limit_seconds}, "
+                             f"nothing is left for {unlisted}")
+        limits.update({name: left / len(unlisted) for name in unlisted})
+
+    out = None
+    report = []
+    curve = []
+    solve_seconds = 0.0
+    num_solutions = 0
+    first_solution_seconds = None
+    for name, term in stages:
+        model.ClearHints()
+        model.Maximize(term)
+        stage_out = solve_shift_model(built, limits[name],
+                                      hint_solution=out["solution"] if out else hint_solution,
+                                      repair_hint=repair_hint and out is None,
+                                      progress_callback=progress_callback,
+                                      num_search_workers=num_search_workers,
+                                      solver_parameters=solver_parameters)
+        if stage_out is None:
+            report.append({"stage": name, "status": "NO_SOLUTION", "value": None, "bound": None,
+                           "seconds": limits[name]})
+            break
+        stats = stage_out["model_stats"]
+        curve += [{**event, "stage": name, "wall_time": solve_seconds + event["wall_time"]}
+                  for event in stage_out["improvement_curve"]]
+        if first_solution_seconds is None and stats["first_solution_seconds"] is not None:
+            first_solution_seconds = solve_seconds + stats["first_solution_seconds"]
+        solve_seconds += stats["solve_seconds"]
+        num_solutions += stats["num_solutions"]
+        value = int(round(stats["objective_value"]))
+        report.append({"stage": name, "status": stage_out["status"], "value": value,
+                       "bound": stats["best_bound"], "seconds": stats["solve_seconds"]})
+        model.Add(term >= value)
+        out = stage_out
+    model.ClearHints()
+    model.Maximize(built["objective"])
+
+    if out is None:
+        return None
+    out["status"] = "OPTIMAL" if all(r["status"] == "OPTIMAL" for r in report) else "FEASIBLE"
+    out["stages"] = report
+    out["improvement_curve"] = curve
+    out["model_stats"].update({"solve_seconds": solve_seconds, "num_solutions": num_solutions,
+                               "first_solution_seconds": first_solution_seconds})
+    return out
+
+
+# --------------------------
+# Incremental repair
+# --------------------------
+def apply_schedule_delta(
+    names: List[str],
+    shift_requests: List[List[List[int]]],
+    STANDARD_SHIFTS: List[str],
+    shift_time_map: Dict[str, List[Tuple[float, float]]],
+    shift_requirements: Union[int, Dict[str, Union[int, List[int]]]],
+    min_shifts_per_person: Union[int, List[int]],
+    max_shifts_per_person: Union[int, List[int]],
+    num_days: int,
+    new_unavailable: List[Tuple[str, int, str]] = None,
+    removed_people: List[str] = None,
+    requirement_changes: Dict[str, Union[int, List[int]]] = None,
+) -> dict:
+    """
+    Apply a change to the planning inputs.
+
+    new_unavailable   - (name, day, standard shift) cells that become -1; a None
+                        standard shift marks the whole day
+    removed_people    - names that leave the roster
+    requirement_changes - {shift_name: int or per-day list} replacing the
+                        current requirement of those shifts
+    Returns the updated inputs and the days the change touches.
+    """
+    removed = set(removed_people or [])
+    for name in removed:
+        if name not in names:
+            raise ValueError(f"Person {name} not in names list")
+    keep = [p for p, n in enumerate(names) if n not in removed]
+
+    new_requests = [[list(day) for day in shift_requests[p]] for p in range(len(names))]
+    affected_days = set()
+    for (name, d, std_name) in new_unavailable or []:
+        if name not in names:
+            raise ValueError(f"Person {name} not in names list")
+        p = names.index(name)
+        std_indices = range(len(STANDARD_SHIFTS)) if std_name is None else [STANDARD_SHIFTS.index(std_name)]
+        for std_idx in std_indices:
+            new_requests[p][d][std_idx] = -1
+        affected_days.add(d)
+
+    def per_person(v):
+        return v if isinstance(v, int) else [v[p] for p in keep]
+
+    def per_day(v):
+        return [v] * num_days if isinstance(v, int) else list(v)
+
+    new_requirements = shift_requirements
+    if requirement_changes:
+        if isinstance(shift_requirements, dict):
+            new_requirements = dict(shift_requirements)
+        else:
+            new_requirements = {s: shift_requirements for s in shift_time_map}
+        for shift_name, v in requirement_changes.items():
+            before = per_day(new_requirements.get(shift_name, 1))
+            after = per_day(v)
+            affected_days.update(d for d in range(num_days) if before[d] != after[d])
+            new_requirements[shift_name] = v
+
+    return {
+        "names": [names[p] for p in keep],
+        "shift_requests": [new_requests[p] for p in keep],
+        "shift_requirements": new_requirements,
+        "min_shifts_per_person": per_person(min_shifts_per_person),
+        "max_shifts_per_person": per_person(max_shifts_per_person),
+        "removed_people": removed,
+        "affected_days": affected_days,
+    }
+
+
+def repair_shifts(
+    solution: Dict[Tuple[str, int, str], int],
+    names: List[str],
+    shift_requests: List[List[List[int]]],
+    STANDARD_SHIFTS: List[str],
+    shift_time_map: Dict[str, List[Tuple[float, float]]],
+    target_shifts: Dict[str, int],
+    num_days: int = None,
+    shift_requirements: Union[int, Dict[str, Union[int, List[int]]]] = 1,
+    min_shifts_per_person: Union[int, List[int]] = 0,
+    max_shifts_per_person: Union[int, List[int]] = 999,
+    min_rest_hours: float = 8.0,
+    time_limit_seconds: int = 10,
+    avoid_double_shift_pairs_daywise: List[Tuple[int, str, int, str]] = None,
+    double_shift_penalty_weight: int = 50,
+    soft_single_shift_weight: int = 20,
+    rest_formulation: str = "pairwise",
+    new_unavailable: List[Tuple[str, int, str]] = None,
+    removed_people: List[str] = None,
+    requirement_changes: Dict[str, Union[int, List[int]]] = None,
+    neighborhood_days: int = 1,
+    change_penalty_weight: int = 1,
+):
+    """
+    Re-plan only the part of `solution` that a change touches.
+
+    The change is described as in apply_schedule_delta. Days touched by it
+    (new -1 cells, days a removed person worked, days whose requirement
+    changed), widened by neighborhood_days on each side, are re-optimized for
+    everyone; all other cells are fixed to their current value. If that window
+    is infeasible it is doubled until it covers the whole horizon. A change
+    that touches no day (none given, or a no-op) re-plans the whole horizon,
+    since then only `solution` itself can be at fault.
+
+    change_penalty_weight is subtracted from the objective per changed cell so
+    that, among equally good schedules, the one closest to `solution` wins.
+    The result has plan_shifts' structure plus "repair_stats".
+    """
+    if num_days is None:
+        num_days = len(shift_requests[0])
+    delta = apply_schedule_delta(
+        names, shift_requests, STANDARD_SHIFTS, shift_time_map, shift_requirements,
+        min_shifts_per_person, max_shifts_per_person, num_days,
+        new_unavailable=new_unavailable,
+        removed_people=removed_people,
+        requirement_changes=requirement_changes,
+    )
+    removed = delta["removed_people"]
+    current = {key for key, v in solution.items() if v and key[0] not in removed}
+    removed_assignments = sum(1 for key, v in solution.items() if v and key[0] in removed)
+    affected_days = set(delta["affected_days"])
+    affected_days.update(d for (n, d, _), v in solution.items() if v and n in removed)
+
+    start = time.perf_counter()
+    radius = neighborhood_days
+    attempts = 0
+    while True:
+        attempts += 1
+        if affected_days:
+            window = {d for d in range(num_days) if any(abs(d - a) <= radius for a in affected_days)}
+        else:
+            window = set(range(num_days))
+        built = build_shift_model(
+            delta["names"], delta["shift_requests"], STANDARD_SHIFTS, shift_time_map, target_shifts,
+            num_days=num_days,
+            shift_requirements=delta["shift_requirements"],
+            min_shifts_per_person=delta["min_shifts_per_person"],
+            max_shifts_per_person=delta["max_shifts_per_person"],
+            min_rest_hours=min_rest_hours,
+            avoid_double_shift_pairs_daywise=avoid_double_shift_pairs_daywise,
+            double_shift_penalty_weight=double_shift_penalty_weight,
+            soft_single_shift_weight=soft_single_shift_weight,
+            rest_formulation=rest_formulation,
+        )
+        model = built["model"]
+        kept_names = built["names"]
+
+        frozen = []
+        free_vars, free_coeffs = [], []
+        currently_on = 0
+        for (p, d, s), var in built["assign"].items():
+            on = (kept_names[p], d, s) in current
+            if d not in window:
+                frozen.append(var if on else var.Not())
+            else:
+                free_vars.append(var)
+                free_coeffs.append(-1 if on else 1)
+                currently_on += on
+        if frozen:
+            model.AddBoolAnd(frozen)
+        # number of changed cells inside the window
+        changes = cp_model.LinearExpr.WeightedSum(free_vars, free_coeffs) + currently_on
+        model.Maximize(built["objective"] - change_penalty_weight * changes)
+
+        out = solve_shift_model(built, time_limit_seconds, hint_solution=solution)
+        if out is not None or len(window) >= num_days:
+            break
+        radius = 2 * radius + 1
+
+    if out is None:
+        return None
+    out["repair_stats"] = {
+        "affected_days": sorted(affected_days),
+        "window_days": sorted(window),
+        "attempts": attempts,
+        "changed_assignments": len(current ^ set(out["solution"])),
+        "removed_assignments": removed_assignments,
+        "seconds": time.perf_counter() - start,
+    }
+    return out
+
+
 def check_solution(
     solution: Dict[Tuple[str,int,str], int],
     names: List[str],
@@ -263,90 +1895,61 @@ def check_solution(
     shift_requirements,
     min_shifts_per_person=0,
     max_shifts_per_person=999,
-    min_rest_hours=8.0
+    min_rest_hours=8.0,
+    sequence_rules: List[dict] = None,
 ):
     violations = []
     P = len(names)
-    name_to_idx = {n: i for i,n in enumerate(names)}
     num_days = len(shift_requests[0])
     shift_names = list(shift_time_map.keys())
+    schedule = as_schedule(solution, names, shift_names, num_days)
+    data = schedule.data
 
-    # normalize min/max
-    if isinstance(min_shifts_per_person, int):
-        min_shifts = [min_shifts_per_person] * P
-    else:
-        min_shifts = list(min_shifts_per_person)
-
-    if isinstance(max_shifts_per_person, int):
-        max_shifts = [max_shifts_per_person] * P
-    else:
-        max_shifts = list(max_shifts_per_person)
-
-    # requirement accessor
-    def req_for(shift_name: str, day: int) -> int:
-        if isinstance(shift_requirements, int):
-            return shift_requirements
-        if isinstance(shift_requirements, dict):
-            v = shift_requirements.get(shift_name, None)
-            if v is None:
-                return 1
-            if isinstance(v, int):
-                return v
-            else:
-                return v[day]
-        return 1
+    min_shifts = person_limits(min_shifts_per_person, P)
+    max_shifts = person_limits(max_shifts_per_person, P)
 
     # 1) Coverage check
-    for d in range(num_days):
-        for s in shift_names:
-            assigned = [pname for (pname, dd, ss), v in solution.items() if v and dd == d and ss == s]
-            req = req_for(s, d)
-            if len(assigned) != req:
-                violations.append(f"[Coverage] Day {d}, shift {s}: assigned={len(assigned)}, required={req}")
+    coverage = data.sum(axis=0, dtype=np.int64)
+    required = requirement_grid(shift_requirements, shift_names, num_days)
+    for d, k in np.argwhere(coverage != required):
+        violations.append(f"[Coverage] Day {d}, shift {shift_names[k]}: "
+                          f"assigned={coverage[d, k]}, required={required[d, k]}")
 
     # 2) Forbidden shifts (-1)
-    for (pname, d, s), v in solution.items():
-        if v:
-            p = name_to_idx[pname]
-            for std_idx,std_name in enumerate(STANDARD_SHIFTS):
-                if shift_requests[p][d][std_idx] == -1:
-                    forbidden_intervals = shift_time_map[std_name]
-                    if shift_intervals_overlap_any(shift_time_map[s], forbidden_intervals):
-                        violations.append(f"[Forbidden] {pname} assigned to {s} on day {d} but marked -1 for {std_name}")
+    # the mask finds the offending cells; the standard shifts are only looked up for the message
+    forbidden, _ = request_masks(shift_requests, STANDARD_SHIFTS, shift_time_map, num_days)
+    overlaps = compile_shift_catalog(shift_time_map).overlap_matrix(cols=STANDARD_SHIFTS)
+    marked = np.asarray(shift_requests, dtype=np.int8).reshape(P, num_days, len(STANDARD_SHIFTS)) == -1
+    for p, d, k in np.argwhere(data.astype(bool) & forbidden):
+        for std_idx in np.flatnonzero(marked[p, d] & overlaps[k]):
+            violations.append(f"[Forbidden] {names[p]} assigned to {shift_names[k]} on day {d} "
+                              f"but marked -1 for {STANDARD_SHIFTS[std_idx]}")
 
     # 3) Min/max per person
-    for p, pname in enumerate(names):
-        total = sum(v for (pp,_,_),v in solution.items() if v and pp==pname)
-        if total < min_shifts[p]:
-            violations.append(f"[Min shifts] {pname}, has {total}, min {min_shifts[p]}")
-        if total > max_shifts[p]:
-            violations.append(f"[Max shifts] {pname}, has {total}, max {max_shifts[p]}")
+    totals = data.sum(axis=(1, 2), dtype=np.int64)
+    too_few = totals < np.asarray(min_shifts)
+    too_many = totals > np.asarray(max_shifts)
+    for p in np.flatnonzero(too_few | too_many):
+        if too_few[p]:
+            violations.append(f"[Min shifts] {names[p]}, has {totals[p]}, min {min_shifts[p]}")
+        if too_many[p]:
+            violations.append(f"[Max shifts] {names[p]}, has {totals[p]}, max {max_shifts[p]}")
 
     # 4) Rest violations (with debug info)
-    for p, pname in enumerate(names):
-        assigned_shifts = [(d,s,shift_time_map[s]) for (pp,d,s),v in solution.items() if v and pp==pname]
-        assigned_shifts.sort(key=lambda x:(x[0],x[2][0][0]))
-        for i in range(len(assigned_shifts)):
-            d1,s1,intervals1 = assigned_shifts[i]
-            for j in range(i+1,len(assigned_shifts)):
-                d2,s2,intervals2 = assigned_shifts[j]
-                # check both directions (since intervals may cross midnight)
-                for ia in intervals1:
-                    for ib in intervals2:
-                        diff = hours_between_intervals(d1, ia, d2, ib)
-                        if diff < min_rest_hours:
-                            violations.append(
-                                f"[Rest] {pname} between {s1}(day{d1}, {ia}) "
-                                f"and {s2}(day{d2}, {ib}), rest={diff:.1f}h < {min_rest_hours}h"
-                            )
-                '''for ia in intervals2:
-                    for ib in intervals1:
-                        diff = hours_between_intervals(d2, ia, d1, ib)
-                        if diff < min_rest_hours:
-                            violations.append(
-                                f"[Rest] {pname} between {s2}(day{d2}, {ia}) "
-                                f"and {s1}(day{d1}, {ib}), rest={diff:.1f}h < {min_rest_hours}h"
-                            )'''
+    for p in np.flatnonzero(data.any(axis=(1, 2))):
+        pname = names[p]
+        breaches, _ = sweep_rest(schedule.person_shifts(pname), shift_time_map, min_rest_hours)
+        for rest, (d1, s1, ia), (d2, s2, ib) in breaches:
+            violations.append(
+                f"[Rest] {pname} between {s1}(day{d1}, {ia}) "
+                f"and {s2}(day{d2}, {ib}), rest={rest:.1f}h < {min_rest_hours}h"
+            )
+
+    # 5) Forbidden sequences (rules without a penalty)
+    for rule in compile_sequence_rules(sequence_rules or [], shift_names):
+        if rule["penalty"] is None:
+            for p, d in np.argwhere(sequence_matches(data, rule)):
+                violations.append(f"[Sequence] {rule['name']}: {names[p]} from day {d}")
 
     return violations
 
@@ -366,50 +1969,116 @@ def build_solution_dict(names: list,
     return solution
 
 
-def save_solution_to_excel(solution, shift_requirements, num_days, filename="schedule.xlsx"):
-    """
-    Save the shift assignment solution to an Excel file.
+EXCEL_LAYOUTS = ("by_day", "week_grid")
+WEEK_GRID_PEOPLE_PER_ROW = 3
 
-    Each day is a separate sheet.
-    Each row is a shift.
-    Each assigned person appears in a separate column.
-    """
 
-    wb = Workbook()
+def _sheet_title(name: str, used: set) -> str:
+    # Excel sheet titles: at most 31 chars, no []:*?/\ and unique (case-insensitive)
+    title = "".join("_" if ch in '[]:*?/\\' else ch for ch in str(name))[:31] or "_"
+    base, i = title, 1
+    while title.lower() in used:
+        i += 1
+        suffix = f" ({i})"
+        title = base[:31 - len(suffix)] + suffix
+    used.add(title.lower())
+    return title
 
-    for d in range(num_days):
-        # Create or select sheet for this day
-        if d == 0:
-            ws = wb.active
-            ws.title = f"Day {d}"
-        else:
-            ws = wb.create_sheet(title=f"Day {d}")
 
-        # Title
-        ws["A1"] = f"Day {d}"
-        ws["A1"].font = Font(bold=True, size=14)
-        ws["A1"].alignment = Alignment(horizontal="center")
+def save_solution_to_excel(solution, shift_requirements, num_days, filename="schedule.xlsx",
+                           layout="by_day", person_sheets=False):
+    """
+    Save the shift assignment solution to an Excel file.
 
-        row = 3
-        ws.column_dimensions['A'].width = 25
-        for c in range(2, 10):
-            ws.column_dimensions[chr(64 + c)].width = 20
+    layout="by_day" (default): each day is a separate sheet, each row is a
+    shift and each assigned person appears in a separate column.
+    layout="week_grid": one "Plan" sheet with 4 columns per day (shift name
+    plus up to 3 people per row, the shift repeated on extra rows) - the
+    plan.xlsx layout V2_checkResultsNew.py reads.
+    person_sheets=True adds one sheet per person listing their (day, shift).
+
+    Only shifts required on a day are written. Assignments are grouped in
+    one pass and the workbook is written in openpyxl's write-only mode, so
+    memory stays flat for long, large rosters. Accepts a solution dict or a
+    Schedule.
+    """
+    if layout not in EXCEL_LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}', expected one of {EXCEL_LAYOUTS}")
 
+    by_cell = assignments_by_cell(solution)
+    wb = Workbook(write_only=True)
+    titles = set()
+
+    def day_rows(d):
         for shift_name, req_list in shift_requirements.items():
             # Only include shifts required for this day
             if d < len(req_list) and req_list[d] > 0:
-                # Find assigned people
-                assigned = [p for (p, dd, s), v in solution.items()
-                            if v and dd == d and s == shift_name]
-
+                assigned = by_cell.get((d, shift_name))
                 if assigned:
-                    ws.cell(row=row, column=1, value=shift_name).font = Font(bold=True)
+                    yield shift_name, assigned
 
-                    for i, person in enumerate(assigned, start=2):
-                        ws.cell(row=row, column=i, value=person)
+    fonts = {}
 
-                    row += 1
+    def bold(ws, value, size=None):
+        if size not in fonts:
+            fonts[size] = Font(bold=True, size=size)
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = fonts[size]
+        return cell
 
+    if layout == "by_day":
+        for d in range(num_days):
+            rows = list(day_rows(d))
+            ws = wb.create_sheet(title=_sheet_title(f"Day {d}", titles))
+            ws.column_dimensions['A'].width = 25
+            for c in range(2, 2 + max([len(assigned) for _, assigned in rows] + [8])):
+                ws.column_dimensions[get_column_letter(c)].width = 20
+
+            # Title
+            title = bold(ws, f"Day {d}", size=14)
+            title.alignment = Alignment(horizontal="center")
+            ws.append([title])
+            ws.append([])
+            for shift_name, assigned in rows:
+                ws.append([bold(ws, shift_name)] + list(assigned))
+    else:
+        ws = wb.create_sheet(title=_sheet_title("Plan", titles))
+        columns = []
+        for d in range(num_days):
+            ws.column_dimensions[get_column_letter(4 * d + 1)].width = 25
+            column = []
+            for shift_name, assigned in day_rows(d):
+                for i in range(0, len(assigned), WEEK_GRID_PEOPLE_PER_ROW):
+                    chunk = assigned[i:i + WEEK_GRID_PEOPLE_PER_ROW]
+                    column.append([shift_name] + chunk + [None] * (WEEK_GRID_PEOPLE_PER_ROW - len(chunk)))
+            columns.append(column)
+        # a full header keeps max_column at 4 * num_days (write-only drops trailing empty cells)
+        ws.append([bold(ws, f"Day {d}" if i == 0 else f"Person {i}") for d in range(num_days) for i in range(4)])
+        for r in range(max((len(column) for column in columns), default=0)):
+            row = []
+            for column in columns:
+                if r < len(column):
+                    row.append(bold(ws, column[r][0]))
+                    row.extend(column[r][1:])
+                else:
+                    row.extend([None] * 4)
+            ws.append(row)
+
+    if person_sheets:
+        by_person = {}
+        for (d, shift_name), assigned in sorted(by_cell.items(), key=lambda item: item[0][0]):
+            for person in assigned:
+                by_person.setdefault(person, []).append((d, shift_name))
+        for person, shifts in by_person.items():
+            ws = wb.create_sheet(title=_sheet_title(person, titles))
+            ws.column_dimensions['B'].width = 25
+            ws.append([bold(ws, person, size=14)])
+            ws.append([bold(ws, "Day"), bold(ws, "Shift")])
+            for d, shift_name in shifts:
+                ws.append([d, shift_name])
+
+    if not wb.worksheets:
+        wb.create_sheet(title="Day 0")
     wb.save(filename)
     print(f"✅ Schedule saved to '{filename}'")
 
@@ -419,12 +2088,12 @@ def print_solution_by_day(solution, shift_requirements, num_days):
       {shift_name: [required_day0, required_day1, ...]}
     Only prints shifts with required > 0.
     """
+    by_cell = assignments_by_cell(solution)
     for d in range(num_days):
         print(f"\nDay {d}")
         for shift_name, req_list in shift_requirements.items():
             if d < len(req_list) and req_list[d] > 0:
-                assigned = [p for (p, dd, s), v in solution.items()
-                            if v and dd == d and s == shift_name]
+                assigned = by_cell.get((d, shift_name), [])
                 if assigned:  # print only if names assigned
                     print(f"  {shift_name}: {', '.join(assigned)}")
 
@@ -434,91 +2103,22 @@ def print_solution_by_day(solution, shift_requirements, num_days):
 # --------------------------
 if __name__ == "__main__":
 
-    names = ['אברהם דיאמנד', 'אהרון רוטנברג', 'אוהד אלקיים', 'אור חבזה', 'אסף ברזיס', 'דביר רוזנברג', 'דין קרמזין',
-             'יאיר בן יוסף', 'יובל ברוכיאן', 'יפתח בן זמרה', 'עודד טובולסקי', 'רונן איזיק', 'רזיאל זקבך']
-    shift_requests = [
-        [[0, 0, -1, -1], [0, 0, -1, 0], [0, -1, 0, 0], [0, 0, 0, 0], [0, 0, -1, -1], [0, 0, -1, -1], [0, 0, 0, 0]],
-        # אברהם דיאמנד
-        [[-1, -1, -1, -1], [0, 0, -1, 0], [0, -1, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]],
-        # אהרון רוטנברג
-        [[-1, 0, 1, 0], [-1, -1, -1, -1], [-1, -1, -1, 0], [0, 0, 1, 0], [0, 0, 1, 0], [0, 0, 1, 0], [0, 1, 0, 0]],
-        # אוהד אלקיים
-        [[-1, -1, -1, -1], [0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 1]],
-        # אור חבזה
-        [[1, 0, 0, 0], [1, -1, -1, -1], [-1, -1, -1, -1], [1, 0, 0, 0], [1, 0, 0, 0], [1, 0, 0, 0], [1, 0, 0, 0]],
-        # אסף ברזיס
-        [[0, 1, 0, 0], [0, 1, -1, 0], [-1, -1, -1, -1], [0, 1, 0, 0], [0, 1, -1, 0], [0, 1, 0, 0], [0, 0, 0, 0]],
-        # דביר רוזנברג
-        [[0, 0, 1, 0], [1, -1, -1, -1], [-1, -1, -1, -1], [0, 0, 1, 0], [0, 0, 1, 0], [0, 0, 1, 0], [0, 0, 0, 0]],
-        # דין קרמזין
-        [[0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]],
-        # יאיר בן יוסף
-        [[-1, 0, 1, 0], [1, 0, 0, 0], [1, 0, 0, 0], [-1, -1, 0, 0], [-1, -1, 0, 0], [-1, -1, 1, 0], [0, 0, 0, 0]],
-        # יובל ברוכיאן
-        [[0, -1, 0, 1], [0, -1, -1, -1], [1, 0, 0, -1], [0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 1], [0, 0, 0, 0]],
-        # יפתח בן זמרה
-        [[0, 0, -1, -1], [0, 0, 0, 0], [1, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [-1, -1, -1, -1], [-1, 0, 0, -1]],
-        # עודד טובולסקי
-        [[-1, 0, -1, 0], [1, -1, 0, 0], [0, -1, 0, 0], [0, -1, 0, -1], [-1, -1, 1, 0], [-1, -1, -1, -1], [0, 0, 0, 0]],
-        # רונן איזיק
-        [[1, 0, 0, 0], [1, 0, 0, 0], [0, 0, 0, 1], [0, 0, 0, 1], [1, 0, 0, 0], [1, 0, 0, 0], [-1, -1, -1, -1]],
-        # רזיאל זקבך
-    ]
-
-
+    from V2_InstanceGenerator import example_week
 
-    num_days = 7
-    '''cols_to_keep = [0, 1]  # indices of columns you want to keep
-    shift_requests = [[row[i] for i in cols_to_keep] for row in shift_requests]'''
+    week = example_week()
+    shift_requirements = week["shift_requirements"]
+    num_days = week["num_days"]
 
-
-    STANDARD_SHIFTS = ["03:00-09:00","09:00-15:00","15:00-21:00","21:00-03:00"]
-    shift_time_map = {
-        "03:00-09:00": [(3,9)],
-        "09:00-15:00": [(9,15)],
-        "15:00-21:00": [(15,21)],
-        "21:00-03:00": [(21,27)],
-        "יזומה 149 בוקר": [(6,9),(17,18.5)],
-        "יזומה 149 בוקר ק": [(6,9)],
-        "יזומה 149 ערב": [(18.5,23)],
-        "דרום 18-24": [(18,24)]
-    }
-
-
-    shift_requirements = {
-        "03:00-09:00":          [1, 2, 2, 2, 2, 2, 1 ],  # Day0 → 2 persons, Day1 → 1 person, Day2 → 2 persons
-        "09:00-15:00":          [1, 2, 3, 0, 0, 0, 0  ],
-        "15:00-21:00":          [1, 2, 2, 0, 1, 0, 1 ],
-        "21:00-03:00":          [2, 3, 2, 2, 1, 1, 2  ],
-        "יזומה 149 בוקר ק":      [0, 2, 0, 0, 0, 0, 0  ],
-        "יזומה 149 בוקר":        [3, 0, 0, 2, 3, 3, 3  ],
-        "יזומה 149 ערב":         [3, 0, 0, 3, 3, 3, 2  ],
-        "דרום 18-24":            [0, 0, 0, 0, 0, 1, 1  ],
-    }
-
-
-
-    target_shifts = {
-    }
-
-    out = plan_shifts(
-        names=names,
-        shift_requests=shift_requests,
-        STANDARD_SHIFTS=STANDARD_SHIFTS,
-        shift_time_map=shift_time_map,
-        target_shifts=target_shifts,
-        num_days=num_days,
-        shift_requirements=shift_requirements,
-        min_shifts_per_person=5,
-        max_shifts_per_person=6,
-        min_rest_hours=12,
-        time_limit_seconds=100,
-        avoid_double_shift_pairs_daywise=[
-            (1, "15:00-21:00", 2, "09:00-15:00")
-        ],
-        double_shift_penalty_weight=50,
-        soft_single_shift_weight = 20,
-    )
+    try:
+        out = plan_shifts(
+            **week,
+            time_limit_seconds=100,
+            double_shift_penalty_weight=50,
+            soft_single_shift_weight=20,
+        )
+    except InfeasibleRosterError as e:
+        print(e)
+        out = None
 
 
     if out:
@@ -544,6 +2144,18 @@ if __name__ == "__main__":
         else:
             print("\n✅ No one has multiple shifts per day.")
 
+        for entry in out["sequence_status"]:
+            if entry["violators"]:
+                matches = ", ".join(f"{name} (day {d})" for name, d in entry["violators"])
+                print(f" ⚠️ Sequence '{entry['rule']}' matched {len(entry['violators'])} times: {matches}")
+
+        if out["coverage_status"]:
+            print("\nCoverage summary:")
+            for entry in out["coverage_status"]:
+                gap = f"short {entry['short']}" if entry["short"] else f"over {entry['over']}"
+                print(f" ⚠️ Day {entry['day']}, {entry['shift']}: assigned {entry['assigned']} of "
+                      f"{entry['required']} ({gap})")
+
         print("Assignments:")
         '''for (p,d,s),v in out["solution"].items():
             print(f" Day {d}, {s} -> {p}")'''
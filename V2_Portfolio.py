@@ -0,0 +1,133 @@
+# Multi-process solver portfolio for plan_shifts
+import inspect
+import multiprocessing
+import os
+import queue
+import time
+from typing import Dict, List
+
+from V2_NurseProblem import plan_shifts, check_feasibility, InfeasibleRosterError, REST_FORMULATIONS
+
+# parameter sets the default portfolio cycles through
+PORTFOLIO_PARAMETER_SETS = [
+    {},
+    {"linearization_level": 2},
+    {"linearization_level": 0},
+    {"optimize_with_core": True},
+]
+
+
+def default_portfolio(num_processes: int, threads_per_process: int) -> List[Dict]:
+    """num_processes configurations differing in seed, rest formulation and parameter set."""
+    configs = []
+    for i in range(num_processes):
+        params = dict(PORTFOLIO_PARAMETER_SETS[i % len(PORTFOLIO_PARAMETER_SETS)])
+        params["random_seed"] = i
+        configs.append({
+            "rest_formulation": ("clique", "pairwise")[i % 2],
+            "num_search_workers": threads_per_process,
+            "solver_parameters": params,
+        })
+    return configs
+
+
+def _portfolio_worker(index: int, plan_kwargs: Dict, config: Dict, results):
+    start = time.perf_counter()
+    try:
+        out = plan_shifts(**plan_kwargs, **config)
+        results.put((index, out, time.perf_counter() - start, None))
+    except Exception as e:
+        results.put((index, None, time.perf_counter() - start, repr(e)))
+
+
+def plan_shifts_portfolio(
+    configs: List[Dict] = None,
+    num_workers: int = None,
+    num_processes: int = None,
+    grace_seconds: float = 60,
+    **plan_kwargs,
+):
+    """
+    Run several independent plan_shifts solves in parallel processes and keep the best.
+
+    plan_kwargs are plan_shifts' arguments (including time_limit_seconds, which
+    every process gets). Each entry of `configs` adds/overrides plan_shifts
+    arguments for one process (rest_formulation, num_search_workers,
+    solver_parameters such as random_seed, ...). By default num_workers is the
+    machine's core count, split into num_processes (num_workers // 8, at least
+    1) processes of equal thread count from default_portfolio(), so the total
+    does not exceed num_workers (unless num_processes > num_workers).
+
+    Returns as soon as a process proves optimality, or when all processes are
+    done, or at time_limit_seconds + grace_seconds; the remaining processes
+    are terminated. The best result (highest objective) is returned with a
+    "portfolio" entry describing every run, or None if no process found a
+    schedule. check_feasibility runs here (unless precheck=False), once per
+    rest formulation of the configs, and raises InfeasibleRosterError before
+    any process is started if none of them can schedule the roster.
+    """
+    precheck = plan_kwargs.pop("precheck", True)
+    plan_kwargs["precheck"] = False
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    if configs is None:
+        if num_processes is None:
+            num_processes = max(1, num_workers // 8)
+        # the default num_processes keeps 8 threads per process (CP-SAT's own portfolio
+        # needs several to find first solutions on large rosters) when there are enough cores
+        configs = default_portfolio(num_processes, max(1, num_workers // num_processes))
+    for config in configs:
+        if config.get("rest_formulation", "pairwise") not in REST_FORMULATIONS:
+            raise ValueError(f"Unknown rest_formulation in portfolio config {config}")
+
+    if precheck:
+        accepted = inspect.signature(check_feasibility).parameters
+        check_kwargs = {k: v for k, v in plan_kwargs.items() if k in accepted}
+        formulations = sorted({config.get("rest_formulation", check_kwargs.get("rest_formulation", "pairwise"))
+                               for config in configs})
+        failures = [check_feasibility(**{**check_kwargs, "rest_formulation": f}) for f in formulations]
+        if failures and all(failures):
+            raise InfeasibleRosterError(failures[0])
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_portfolio_worker, args=(i, plan_kwargs, config, results), daemon=True)
+                 for i, config in enumerate(configs)]
+    start = time.perf_counter()
+    for proc in processes:
+        proc.start()
+
+    deadline = start + plan_kwargs.get("time_limit_seconds", 20) + grace_seconds
+    runs = [{"config": config, "status": "CANCELLED", "objective": None, "wall_seconds": None}
+            for config in configs]
+    best_index, best = None, None
+    pending = len(processes)
+    while pending:
+        try:
+            index, out, seconds, error = results.get(timeout=max(0.0, deadline - time.perf_counter()))
+        except queue.Empty:
+            break
+        pending -= 1
+        runs[index].update({
+            "status": out["status"] if out else ("ERROR" if error else "NO_SOLUTION"),
+            "objective": out["objective"] if out else None,
+            "wall_seconds": seconds,
+            "error": error,
+        })
+        if out and (best is None or out["objective"] > best["objective"]):
+            best_index, best = index, out
+        if out and out["status"] == "OPTIMAL":
+            break
+
+    for proc in processes:
+        if proc.is_alive():
+            proc.terminate()
+    for proc in processes:
+        proc.join()
+
+    if best is None:
+        return None
+    best["portfolio"] = {"winner": best_index, "runs": runs,
+                         "wall_seconds": time.perf_counter() - start}
+    return best
@@ -0,0 +1,180 @@
+# Rolling-horizon driver for long rosters
+import math
+import time
+from typing import Dict, List, Tuple, Union
+
+from V2_NurseProblem import (
+    build_shift_model, solve_shift_model, build_rest_conflict_index, compile_shift_catalog,
+    schedule_status, schedule_objective, coverage_status, sequence_status, requirement_grid, person_limits,
+    Schedule,
+)
+
+
+def _slice_requirements(shift_requirements, start: int, end: int):
+    if isinstance(shift_requirements, int):
+        return shift_requirements
+    return {s: v if isinstance(v, int) else list(v[start:end]) for s, v in shift_requirements.items()}
+
+
+def plan_shifts_rolling(
+    names: List[str],
+    shift_requests: List[List[List[int]]],
+    STANDARD_SHIFTS: List[str],
+    shift_time_map: Dict[str, List[Tuple[float, float]]],
+    target_shifts: Dict[str, int],
+    num_days: int = None,
+    shift_requirements: Union[int, Dict[str, Union[int, List[int]]]] = 1,
+    min_shifts_per_person: Union[int, List[int]] = 0,
+    max_shifts_per_person: Union[int, List[int]] = 999,
+    min_rest_hours: float = 8.0,
+    time_limit_seconds: int = 20,
+    avoid_double_shift_pairs_daywise: List[Tuple[int, str, int, str]] = None,
+    double_shift_penalty_weight: int = 50,
+    soft_single_shift_weight: int = 20,
+    rest_formulation: str = "pairwise",
+    window_days: int = 14,
+    overlap_days: int = 7,
+):
+    """
+    Solve the horizon as a sequence of overlapping windows.
+
+    Each window of window_days is solved with plan_shifts' model; only its
+    first window_days - overlap_days days are committed (the last window
+    commits everything) and the next window starts right after them, warm
+    started from the uncommitted look-ahead. Carried forward between windows:
+      - rest: cells that would break min_rest_hours against a committed
+        shift are forbidden;
+      - quotas: the running shift count per person is subtracted from its
+        min/max (target_shifts count as min == max). The remaining quota is
+        pro-rated over the remaining days; if a window is infeasible it is
+        retried with only the hard caps (0 .. remaining max), and the last
+        window always gets the exact remainder.
+    Avoid-double pairs are enforced inside a window only.
+
+    time_limit_seconds is per window. Returns plan_shifts' result structure,
+    with the objective, "coverage_status" and "sequence_status" evaluated on
+    the whole horizon (no sequence rules are taken, so the latter is always
+    empty), or None if a window has no solution. "improvement_curve" chains
+    the windows' curves: each event carries its "window" index, wall_time is
+    counted from the start of the run and objective/best_bound are those of
+    the window model.
+    """
+    start_time = time.perf_counter()
+    P = len(names)
+    if num_days is None:
+        num_days = len(shift_requests[0])
+    if overlap_days >= window_days:
+        raise ValueError("overlap_days must be smaller than window_days")
+    step = window_days - overlap_days
+
+    min_shifts = person_limits(min_shifts_per_person, P)
+    max_shifts = person_limits(max_shifts_per_person, P)
+    for p, name in enumerate(names):
+        if name in target_shifts:
+            min_shifts[p] = max_shifts[p] = target_shifts[name]
+
+    rest_index = build_rest_conflict_index(shift_time_map, num_days, min_rest_hours)
+    catalog = compile_shift_catalog(shift_time_map)
+    shift_names = list(shift_time_map.keys())
+    name_to_idx = {n: p for p, n in enumerate(names)}
+    solution = {}
+    counts = [0] * P
+    lookahead = {}
+    windows = []
+    curve = []
+
+    start = 0
+    while start < num_days:
+        end = min(start + window_days, num_days)
+        last = end == num_days
+        commit_end = end if last else start + step
+        remaining_days = num_days - start
+        share = (end - start) / remaining_days
+
+        need = [max(0, min_shifts[p] - counts[p]) for p in range(P)]
+        room = [max_shifts[p] - counts[p] for p in range(P)]
+        if last:
+            attempts = [(need, room)]
+        else:
+            prorated_min = [min(room[p], int(need[p] * share)) for p in range(P)]
+            prorated_max = [max(prorated_min[p], min(room[p], math.ceil(room[p] * share))) for p in range(P)]
+            attempts = [(prorated_min, prorated_max), ([0] * P, room)]
+
+        pairs = [(da - start, sa, db - start, sb)
+                 for (da, sa, db, sb) in avoid_double_shift_pairs_daywise or []
+                 if start <= min(da, db) and max(da, db) < end]
+        hint = {(n, d - start, s): 1 for (n, d, s) in lookahead if start <= d < end}
+        boundary = {}
+        for (name, d0, s0) in solution:
+            if d0 >= start - rest_index["max_offset"]:
+                boundary.setdefault(name_to_idx[name], []).append((d0, s0))
+
+        out = None
+        for window_min, window_max in attempts:
+            built = build_shift_model(
+                names, [row[start:end] for row in shift_requests], STANDARD_SHIFTS, shift_time_map, {},
+                num_days=end - start,
+                shift_requirements=_slice_requirements(shift_requirements, start, end),
+                min_shifts_per_person=window_min,
+                max_shifts_per_person=window_max,
+                min_rest_hours=min_rest_hours,
+                avoid_double_shift_pairs_daywise=pairs,
+                double_shift_penalty_weight=double_shift_penalty_weight,
+                soft_single_shift_weight=soft_single_shift_weight,
+                rest_formulation=rest_formulation,
+            )
+            # rest against shifts committed before the window
+            blocked = []
+            for (p, d, s), var in built["assign"].items():
+                if d >= rest_index["max_offset"]:
+                    continue
+                for (d0, s0) in boundary.get(p, ()):
+                    if catalog.violates_rest(d0, s0, start + d, s, min_rest_hours):
+                        blocked.append(var.Not())
+                        break
+            if blocked:
+                built["model"].AddBoolAnd(blocked)
+
+            solve_start = time.perf_counter() - start_time
+            out = solve_shift_model(built, time_limit_seconds, hint_solution=hint or None)
+            if out is not None:
+                break
+        if out is None:
+            return None
+
+        curve += [{**event, "window": len(windows), "wall_time": solve_start + event["wall_time"]}
+                  for event in out["improvement_curve"]]
+        windows.append({"start": start, "end": end, "status": out["status"], **out["model_stats"]})
+        lookahead = {}
+        for (name, d, s) in out["solution"]:
+            if start + d < commit_end:
+                solution[(name, start + d, s)] = 1
+                counts[name_to_idx[name]] += 1
+            else:
+                lookahead[(name, start + d, s)] = 1
+        start = commit_end
+
+    schedule = Schedule.from_dict(solution, names, shift_names, num_days)
+    double_shift_status, multi_shift_status = schedule_status(
+        schedule, names, shift_names, num_days, avoid_double_shift_pairs_daywise)
+    return {
+        "status": "FEASIBLE",
+        "solution": solution,
+        "schedule": schedule,
+        "shift_counts": {names[p]: counts[p] for p in range(P)},
+        "objective": schedule_objective(
+            schedule, names, shift_requests, STANDARD_SHIFTS, shift_time_map, num_days,
+            avoid_double_shift_pairs_daywise, double_shift_penalty_weight, soft_single_shift_weight),
+        "double_shift_status": double_shift_status,
+        "multi_shift_status": multi_shift_status,
+        "coverage_status": coverage_status(schedule, requirement_grid(shift_requirements, shift_names, num_days),
+                                           names, shift_names, num_days),
+        "sequence_status": sequence_status(schedule, names, shift_names, num_days),
+        "model_stats": {
+            "build_seconds": sum(w["build_seconds"] for w in windows),
+            "solve_seconds": sum(w["solve_seconds"] for w in windows),
+            "wall_seconds": time.perf_counter() - start_time,
+            "windows": windows,
+        },
+        "improvement_curve": curve,
+    }
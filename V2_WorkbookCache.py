@@ -0,0 +1,148 @@
+# Content-hashed on-disk cache of parsed worksheet grids
+import hashlib
+import os
+import pickle
+from typing import Iterator, List, Optional
+
+import openpyxl
+
+CACHE_VERSION = 1
+CACHE_DIR_NAME = ".workbook_cache"
+DEFAULT_FILL_INDEX = "00000000"
+
+
+class SheetGrid:
+    """
+    The parsed cells of one worksheet range.
+
+    values[i][j] is the value of cell (min_row + i, min_col + j) and, when
+    fills were requested, fills[i][j] is its fill's start_color.index (an
+    'AARRGGBB' string or an indexed/theme number). Cells outside the range
+    read as None. Rows and columns are 1-based, as in openpyxl.
+    """
+
+    def __init__(self, values: List[tuple], fills: Optional[List[tuple]], min_row: int, min_col: int):
+        self.values = values
+        self.fills = fills
+        self.min_row = min_row
+        self.min_col = min_col
+        self.from_cache = False
+
+    @property
+    def max_row(self) -> int:
+        return self.min_row + len(self.values) - 1
+
+    @property
+    def max_column(self) -> int:
+        return self.min_col + max((len(row) for row in self.values), default=0) - 1
+
+    def _get(self, table, row: int, column: int):
+        i, j = row - self.min_row, column - self.min_col
+        if table is None or not (0 <= i < len(table)) or not (0 <= j < len(table[i])):
+            return None
+        return table[i][j]
+
+    def cell(self, row: int, column: int):
+        return self._get(self.values, row, column)
+
+    def fill(self, row: int, column: int):
+        if self.fills is None:
+            raise ValueError("Grid was loaded without fills; pass fills=True to load_sheet")
+        return self._get(self.fills, row, column)
+
+    def iter_rows(self, min_row: int = None, max_row: int = None,
+                  min_col: int = None, max_col: int = None) -> Iterator[tuple]:
+        """Value tuples like openpyxl's iter_rows(values_only=True)."""
+        min_row = self.min_row if min_row is None else min_row
+        max_row = self.max_row if max_row is None else max_row
+        min_col = self.min_col if min_col is None else min_col
+        max_col = self.max_column if max_col is None else max_col
+        width = max_col - min_col + 1
+        lo, hi = min_col - self.min_col, max_col - self.min_col + 1
+        pad_left = (None,) * min(width, max(0, -lo))
+        for row in range(min_row, max_row + 1):
+            i = row - self.min_row
+            values = self.values[i] if 0 <= i < len(self.values) else ()
+            cells = pad_left + values[max(0, lo):max(0, hi)]
+            yield cells + (None,) * (width - len(cells))
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _fill_index(cell):
+    # read-only mode has no style for empty cells; full mode reports the default fill
+    fill = getattr(cell, "fill", None)
+    return fill.start_color.index if fill is not None else DEFAULT_FILL_INDEX
+
+
+def _parse_sheet(path: str, sheet_name: str, min_row: int, max_row: Optional[int],
+                 min_col: int, max_col: Optional[int], data_only: bool, fills: bool) -> SheetGrid:
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=data_only)
+    try:
+        sheet = wb[sheet_name]
+        values, colors = [], [] if fills else None
+        for row in sheet.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col):
+            values.append(tuple(cell.value for cell in row))
+            if fills:
+                colors.append(tuple(_fill_index(cell) for cell in row))
+    finally:
+        wb.close()
+
+    # read-only rows can be ragged; pad them to one width
+    width = max_col - min_col + 1 if max_col is not None else max((len(r) for r in values), default=0)
+    values = [r + (None,) * (width - len(r)) for r in values]
+    if fills:
+        colors = [r + (DEFAULT_FILL_INDEX,) * (width - len(r)) for r in colors]
+    return SheetGrid(values, colors, min_row, min_col)
+
+
+def load_sheet(
+    path: str,
+    sheet_name: str,
+    min_row: int = 1,
+    max_row: int = None,
+    min_col: int = 1,
+    max_col: int = None,
+    data_only: bool = False,
+    fills: bool = False,
+    cache_dir: str = None,
+) -> SheetGrid:
+    """
+    Parsed cell grid of a worksheet range, served from an on-disk cache.
+
+    The cache key is the SHA-256 of the workbook's bytes plus the sheet, the
+    range and the parse options, so any edit to the file invalidates it. Grids
+    are pickled into cache_dir (default: a .workbook_cache folder next to the
+    workbook); a missing or unreadable entry is re-parsed with openpyxl in
+    read-only mode and written back.
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+    options = (CACHE_VERSION, sheet_name, min_row, max_row, min_col, max_col, data_only, fills)
+    key = hashlib.sha256(f"{file_digest(path)}|{options!r}".encode("utf-8")).hexdigest()
+    cache_path = os.path.join(cache_dir, f"{key}.pkl")
+
+    try:
+        with open(cache_path, "rb") as f:
+            grid = pickle.load(f)
+        grid.from_cache = True
+        return grid
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+
+    grid = _parse_sheet(path, sheet_name, min_row, max_row, min_col, max_col, data_only, fills)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(grid, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # a read-only location just means no caching
+    return grid
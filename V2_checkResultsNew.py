@@ -1,5 +1,7 @@
 import openpyxl
 
+from V2_NurseProblem import sweep_rest
+
 names = ['אביב ברזל', 'אברהם דיאמנד', 'אהרון רוטנברג', 'אוהד אלקיים', 'אור חבזה', 'משה עוזיאל', 'אלעד מאיר',
          'אסף ברזיס', 'דביר רוזנברג', 'דין קרמזין', 'יאיר בן יוסף', 'יאיר מימון', 'יואל שפץ', 'יובל ברוכיאן',
          'יונתן פרידלנדר', 'יפתח בן זמרה', 'מאיר סמסון', 'משה וילנסקי', 'משה ליפן', 'עודד טובולסקי', 'עקיבא עמיאל',
@@ -47,6 +49,9 @@ shift_time_map = {
     "הורדיון 13-17": [(13, 17)],
 }
 
+# minimum rest between two shifts of the same person
+min_rest_hours = 8
+
 
 
 
@@ -102,8 +107,8 @@ shift_counts = {name: 0 for name in names}
 wb = openpyxl.load_workbook("plan.xlsx")
 ws = wb.active
 
-# Assuming each day block has 4 columns
-num_days = (ws.max_column) // 4
+# Assuming each day block has 4 columns (the last one may end early)
+num_days = -(-ws.max_column // 4)
 
 for d in range(num_days):
     col_start = d * 4 + 1
@@ -122,8 +127,7 @@ for d in range(num_days):
 
             # Save assignment
             shift_counts[person] += 1
-            for interval in shift_time_map[shift_title]:
-                assignments[person].append((d, interval, shift_title))
+            assignments[person].append((d, shift_title))
 
             # Check constraint violation
             if person in names:
@@ -137,34 +141,25 @@ for d in range(num_days):
                     if shift_requests[i][d][shift_index] == -1:
                         violations.append((person, d, shift_title))'''
 
-# Check rest time >= 8h
+# Check rest time >= min_rest_hours
 rest_violations = []
 min_dist = 1000
 min_dist_person = "non"
 
 for person, shifts in assignments.items():
-    shifts_sorted = sorted(shifts, key=lambda x: (x[0], x[1][0]))  # sort by day, start time
-    for i in range(1, len(shifts_sorted)):
-        day1, (s1, e1), shift1 = shifts_sorted[i-1]
-        day2, (s2, e2), shift2 = shifts_sorted[i]
-
-        # 🚫 skip if same logical shift (like two intervals of יזומה 149 בוקר)
-        if shift1 == shift2:
-            continue
-
-        hours_between = (day2*24 + s2) - (day1*24 + e1)
-        if hours_between < min_dist:
-            min_dist = hours_between
-            min_dist_person = person
-        if hours_between < 8:
-            rest_violations.append((person, shifts_sorted[i-1], shifts_sorted[i]))
+    breaches, tightest = sweep_rest(shifts, shift_time_map, min_rest_hours)
+    for rest, (day1, shift1, interval1), (day2, shift2, interval2) in breaches:
+        rest_violations.append((person, (day1, interval1, shift1), (day2, interval2, shift2), rest))
+    if tightest and tightest[0] < min_dist:
+        min_dist = tightest[0]
+        min_dist_person = person
 
 
 print("🚨 Constraint Violations:")
 for v in violations:
     print(v)
 
-print("\n⏰ Rest Violations (<8h):")
+print(f"\n⏰ Rest Violations (<{min_rest_hours}h):")
 for rv in rest_violations:
     print(rv)
 
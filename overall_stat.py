@@ -1,7 +1,8 @@
-from openpyxl import load_workbook
 from collections import defaultdict
 import matplotlib.pyplot as plt
 
+from V2_WorkbookCache import load_sheet
+
 
 def check_string_in_row(row, target_string):
     for i, cell_value in enumerate(row):
@@ -11,16 +12,15 @@ def check_string_in_row(row, target_string):
 
 target_name = "עמוס"
 
-# Load the Excel file
-workbook = load_workbook(rf"C:\Users\uziki\OneDrive\שולחן העבודה\2שבצק.xlsx")
-sheet = workbook['Sheet1']
+# Load the Excel file (parsed once, then served from the workbook cache)
+sheet = load_sheet(rf"C:\Users\uziki\OneDrive\שולחן העבודה\2שבצק.xlsx", 'Sheet1')
 
 roles_counter = defaultdict(int)
 
 # Iterate through each row in the sheet
 row_ind = 0
 shifts = 0
-for row in sheet.iter_rows(values_only=True):
+for row in sheet.iter_rows():
     # Assuming the role titles are in rows with red background
     if row and\
             (check_string_in_row(row, "שג")!=-1 or